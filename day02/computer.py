@@ -1,4 +1,5 @@
 from day02.input import INSTRUCTIONS
+from intcode.batch import Job, run_batch
 from intcode.computer import Computer
 
 
@@ -13,17 +14,12 @@ def part1():
 
 
 def part2():
-    for i in range(0, 100):
-        for j in range(0, 100):
-            instructions: [int] = INSTRUCTIONS.copy()
-            instructions[1] = i
-            instructions[2] = j
-            computer: Computer = Computer(instructions, lambda: int(input('Please enter a number')),
-                                          lambda output: print(f'> {output}'))
-            computer.execute()
-            if instructions[0] == 19690720:
-                print(f'100 * {i} + {j} = {100 * i + j}')
-                return
+    jobs = [Job(patches={1: i, 2: j}, reads=[0]) for i in range(0, 100) for j in range(0, 100)]
+    for result in run_batch(INSTRUCTIONS, jobs, chunk_size=256, vectorise=True):
+        if result.values[0] == 19690720:
+            i, j = divmod(result.index, 100)
+            print(f'100 * {i} + {j} = {100 * i + j}')
+            return
 
 
 if __name__ == '__main__':
@@ -1,25 +1,18 @@
 from day15.input import INSTRUCTIONS
-from intcode.computer import InputInstruction, Computer, Cell
-
-cell: Cell = Cell()
+from intcode.computer import Computer
 
 
 class Path:
 
-    def __init__(self, path: {(int, int)}, location: (int, int), instruction: InputInstruction,
-                 modes, done=False):
+    def __init__(self, path: {(int, int)}, location: (int, int), computer: Computer, done=False):
         self.path = path
         self.location = location
-        self.instruction = instruction
+        self.computer = computer
         self.done = done
-        self.modes = modes
 
     def get_next(self):
         coming = []
         for i in range(1, 5):
-            attempt: InputInstruction = self.instruction.copy()
-            attempt.input_handle = lambda: i
-            attempt.execute(self.modes)
             location = self.location
 
             if i == 1:
@@ -31,14 +24,18 @@ class Path:
             elif i == 4:
                 location = location[0] + 1, location[1]
 
-            request = attempt._computer.execute(True)
             if location not in self.path:
+                attempt: Computer = self.computer.fork()
+                attempt.inputs.append(i)
+                attempt.run_until()
+                status = attempt.outputs.popleft()
+
                 path = self.path.copy()
                 path.add(location)
-                if cell.value == 1:
-                    coming.append(Path(path, location, request[0], request[1]))
-                elif cell.value == 2:
-                    coming.append(Path(path, location, request[0], request[1], True))
+                if status == 1:
+                    coming.append(Path(path, location, attempt))
+                elif status == 2:
+                    coming.append(Path(path, location, attempt, True))
         return coming
 
     def __len__(self):
@@ -50,20 +47,14 @@ class Path:
 
 class Oxygen:
 
-    def __init__(self, filled: {(int, int)}, location: (int, int), instruction: InputInstruction,
-                 modes):
+    def __init__(self, filled: {(int, int)}, location: (int, int), computer: Computer):
         self.filled = filled
         self.location = location
-        self.instruction = instruction
-        self.modes = modes
+        self.computer = computer
 
     def get_infected(self):
         coming = []
         for i in range(1, 5):
-            attempt = self.instruction.copy()
-            attempt.input_handle = lambda: i
-            attempt.execute(self.modes)
-
             location = self.location
 
             if i == 1:
@@ -75,11 +66,14 @@ class Oxygen:
             elif i == 4:
                 location = location[0] + 1, location[1]
 
-            request = attempt._computer.execute(True)
             if location not in self.filled:
+                attempt: Computer = self.computer.fork()
+                attempt.inputs.append(i)
+                attempt.run_until()
+
                 self.filled.add(location)
-                if cell.value == 1:
-                    coming.append(Oxygen(self.filled, location, request[0], request[1]))
+                if attempt.outputs.popleft() == 1:
+                    coming.append(Oxygen(self.filled, location, attempt))
         return coming
 
     def __str__(self):
@@ -87,11 +81,11 @@ class Oxygen:
 
 
 def get_shortest_path():
-    instructions: [int] = INSTRUCTIONS.copy()
-    computer: Computer = Computer(instructions, lambda: 0, cell.set_value)
-    request: (InputInstruction, [int]) = computer.execute(True)
-    path = Path({(0, 0)}, (0, 0), request[0], request[1])
+    computer: Computer = Computer(INSTRUCTIONS.copy(), None, None)
+    computer.run_until()
+    path = Path({(0, 0)}, (0, 0), computer)
     paths = {0: [path]}
+    seen = {computer.fingerprint()}
 
     min_path_len = 0
     min_path = None
@@ -102,6 +96,10 @@ def get_shortest_path():
 
         for path in cursors:
             for next_path in path.get_next():
+                fingerprint = next_path.computer.fingerprint()
+                if fingerprint in seen:
+                    continue
+                seen.add(fingerprint)
                 next_len = len(next_path)
                 if not next_path.done:
                     if next_len not in paths:
@@ -121,7 +119,7 @@ def part1():
 
 def part2():
     path = get_shortest_path()
-    latest_oxygen = [Oxygen(set(path.location), path.location, path.instruction, path.modes)]
+    latest_oxygen = [Oxygen(set(path.location), path.location, path.computer)]
     minutes = 0
     while len(latest_oxygen) > 0:
         next_oxygen = set()
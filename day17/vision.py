@@ -1,6 +1,7 @@
 from enum import Enum, IntEnum
 
 from day17.input import INSTRUCTIONS
+from intcode.ascii import AsciiChannel
 from intcode.computer import Computer
 
 
@@ -27,6 +28,15 @@ class Board:
         else:
             self.cursor = (0, self.cursor[1] - 1)
 
+    def fill_line(self, line: str):
+        y = self.cursor[1]
+        for x, character in enumerate(line):
+            self.filled[(x, y)] = ord(character)
+        if line:
+            self.max_x = max(self.max_x, len(line) - 1)
+            self.min_y = min(self.min_y, y)
+        self.cursor = (0, y - 1)
+
     def intersections(self, value: int) -> (int, int):
         result = set()
         for location in self.filled:
@@ -55,10 +65,12 @@ class Board:
 
 def get_board():
     board: Board = Board()
-    instructions = INSTRUCTIONS.copy()
-    computer: Computer = Computer(instructions, lambda: int(input('Please enter a number ')),
-                                  board.fill)
-    computer.execute()
+    channel: AsciiChannel = AsciiChannel(Computer(INSTRUCTIONS.copy(), None, None))
+    channel.run()
+    for line in channel.lines():
+        board.fill_line(line)
+    for value in map(ord, channel.text()):
+        board.fill(value)
     return board
 
 
@@ -1,5 +1,13 @@
+import functools
+
 from day19.input import INSTRUCTIONS
-from intcode.computer import Computer
+from intcode.batch import Job, run_batch
+from intcode.pool import ComputerPool
+
+
+@functools.cache
+def pool() -> ComputerPool:
+    return ComputerPool(INSTRUCTIONS, 1, warm=True)
 
 
 class Beam:
@@ -7,33 +15,13 @@ class Beam:
     def __init__(self, diagonal: int):
         self.locations: {(int, int)} = set()
         self.diagonal = diagonal
-        self.x = 0
-        self.y = 0
-        self.send_x = True
-        self.done = False
-
-    def handle_input(self) -> int:
-        if not self.done:
-            if self.send_x:
-                self.send_x = False
-                return self.x
-            else:
-                self.send_x = True
-                return self.y
-        else:
-            return -1
 
-    def handle_output(self, output: int):
-        if output == 1:
-            self.locations.add((self.x, self.y))
-        if self.x == self.diagonal - 1:
-            self.x = 0
-            if self.y == self.diagonal - 1:
-                self.done = True
-            else:
-                self.y += 1
-        else:
-            self.x += 1
+    def scan(self):
+        points = [(x, y) for y in range(self.diagonal) for x in range(self.diagonal)]
+        jobs = [Job(point) for point in points]
+        for point, result in zip(points, run_batch(INSTRUCTIONS, jobs, vectorise=True)):
+            if result.outputs[0] == 1:
+                self.locations.add(point)
 
     def render(self):
         for y in range(self.diagonal):
@@ -97,10 +85,8 @@ def find_ship_beam_range(step_size: int, diagonal: int, start: int = 0) -> int:
     while True:
         ship_beam: ShipBeam = ShipBeam(diagonal, y)
         while not ship_beam.done:
-            instructions = INSTRUCTIONS.copy()
-            computer: Computer = Computer(instructions, ship_beam.handle_input,
-                                          ship_beam.handle_output)
-            computer.execute()
+            with pool().computer(ship_beam.handle_input, ship_beam.handle_output) as computer:
+                computer.execute()
         if ship_beam.fits:
             return y - step_size
         else:
@@ -109,10 +95,7 @@ def find_ship_beam_range(step_size: int, diagonal: int, start: int = 0) -> int:
 
 def part1():
     beam: Beam = Beam(50)
-    while not beam.done:
-        instructions = INSTRUCTIONS.copy()
-        computer: Computer = Computer(instructions, beam.handle_input, beam.handle_output)
-        computer.execute()
+    beam.scan()
     print(f'Pulling on: {len(beam.locations)} points')
 
 
@@ -123,10 +106,8 @@ def part2():
 
     ship_beam: ShipBeam = ShipBeam(diagonal, total_minimum + diagonal)
     while not ship_beam.done:
-        instructions = INSTRUCTIONS.copy()
-        computer: Computer = Computer(instructions, ship_beam.handle_input,
-                                      ship_beam.handle_output)
-        computer.execute()
+        with pool().computer(ship_beam.handle_input, ship_beam.handle_output) as computer:
+            computer.execute()
     print(f'{diagonal} x {diagonal} square corner:'
           f' {min([coord[0] - 1 for coord in ship_beam.locations]) * 10_000 + total_minimum}')
 
@@ -1,7 +1,15 @@
+import functools
 import sys
 
 from day21.input import INSTRUCTIONS
-from intcode.computer import Computer
+from intcode.ascii import AsciiChannel
+from intcode.computer import Event
+from intcode.snapshot import Snapshot, boot
+
+
+@functools.cache
+def image() -> Snapshot:
+    return boot(INSTRUCTIONS)
 
 
 class JumpScriptHandler:
@@ -46,55 +54,32 @@ class JumpScriptHandler:
         ]
 
         self.walk = walk
-        self.action_cursor = 0
-        self.char_cursor = 0
-        self.line = ''
-
-    def handle_input(self) -> int:
-        actions = self.walk_actions if self.walk else self.run_actions
-
-        if self.action_cursor < len(actions):
-            action = actions[self.action_cursor]
-            if self.char_cursor < len(action):
-                character = action[self.char_cursor]
-                self.char_cursor += 1
-                return ord(character)
-            else:
-                self.char_cursor = 0
-                self.action_cursor += 1
-                return ord('\n')
-        else:
-            print('ERROR: No new input')
-            sys.exit()
-
-    def handle_output(self, output: int):
-        try:
-            character = str(chr(output))
-            if character != '\n':
-                self.line += character
-            else:
-                print(self.line)
-                self.line = ''
-        except ValueError:
-            print(f'Amount of hull damage: {output}')
+
+    def script(self) -> str:
+        return '\n'.join(self.walk_actions if self.walk else self.run_actions) + '\n'
+
+
+def survey(walk: bool):
+    script_handler: JumpScriptHandler = JumpScriptHandler(walk)
+    channel: AsciiChannel = AsciiChannel(image().spawn())
+    channel.write(script_handler.script())
+    event = channel.run()
+
+    for line in channel.lines():
+        print(line)
+    if event == Event.INPUT:
+        print('ERROR: No new input')
+        sys.exit()
+    for value in channel.values:
+        print(f'Amount of hull damage: {value}')
 
 
 def part1():
-    script_handler: JumpScriptHandler = JumpScriptHandler(True)
-    instructions = INSTRUCTIONS.copy()
-    computer: Computer = Computer(instructions,
-                                  script_handler.handle_input,
-                                  script_handler.handle_output)
-    computer.execute()
+    survey(True)
 
 
 def part2():
-    script_handler: JumpScriptHandler = JumpScriptHandler(False)
-    instructions = INSTRUCTIONS.copy()
-    computer: Computer = Computer(instructions,
-                                  script_handler.handle_input,
-                                  script_handler.handle_output)
-    computer.execute()
+    survey(False)
 
 
 if __name__ == '__main__':
@@ -1,33 +1,22 @@
 from day25.input import INSTRUCTIONS
-from intcode.computer import Computer
-
-
-class DroidScriptHandler:
-
-    def __init__(self):
-        self.action = ''
-        self.line = ''
-
-    def handle_input(self) -> int:
-        if self.action:
-            character = self.action[0]
-            self.action = self.action[1:]
-            return ord(character)
-        else:
-            self.action = input('> ') + '\n'
-            return self.handle_input()
-
-    def handle_output(self, output: int):
-        character = str(chr(output))
-        if character != '\n':
-            self.line += character
-        else:
-            print(self.line)
-            self.line = ''
+from intcode import checkpoint
+from intcode.ascii import AsciiChannel
+from intcode.computer import Computer, Event
 
 
 if __name__ == '__main__':
-    instructions = INSTRUCTIONS.copy()
-    droidScript: DroidScriptHandler = DroidScriptHandler()
-    computer: Computer = Computer(instructions, droidScript.handle_input, droidScript.handle_output)
-    computer.execute()
+    channel: AsciiChannel = AsciiChannel(Computer(INSTRUCTIONS.copy(), None, None))
+    while channel.run() == Event.INPUT:
+        for line in channel.lines():
+            print(line)
+        command = input('> ')
+        while command.startswith(('save ', 'load ')):
+            if command.startswith('save '):
+                checkpoint.save(channel.computer, command[5:])
+            else:
+                channel.computer = checkpoint.restore(command[5:])
+                print(f'Restored {command[5:]}')
+            command = input('> ')
+        channel.write(command + '\n')
+    for line in channel.lines():
+        print(line)
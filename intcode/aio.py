@@ -0,0 +1,43 @@
+import asyncio
+
+from intcode.computer import Computer, Event
+
+
+class AsyncComputer(Computer):
+
+    def __init__(self, instructions: [int], input_queue: asyncio.Queue = None,
+                 output_queue: asyncio.Queue = None, idle: int = None, on_idle=None, debug=False,
+                 relative=0, cursor=0, engine: str = None):
+        super().__init__(instructions, None, None, debug, relative, cursor, engine)
+        self.input_queue = input_queue if input_queue is not None else asyncio.Queue()
+        self.output_queue = output_queue if output_queue is not None else asyncio.Queue()
+        self.idle = idle
+        self.on_idle = on_idle
+        self.waiting = False
+
+    async def run_async(self):
+        polled = False
+        while True:
+            event = self.run_until()
+            if self.outputs:
+                polled = False
+                while self.outputs:
+                    await self.output_queue.put(self.outputs.popleft())
+            if event == Event.HALT:
+                return
+            elif event == Event.BREAK:
+                continue
+
+            if self.input_queue.empty():
+                if self.idle is not None and not polled:
+                    polled = True
+                    self.inputs.append(self.idle)
+                    continue
+                self.waiting = True
+                if self.on_idle is not None:
+                    self.on_idle()
+            self.inputs.append(await self.input_queue.get())
+            self.waiting = False
+            polled = False
+            while not self.input_queue.empty():
+                self.inputs.append(self.input_queue.get_nowait())
@@ -0,0 +1,50 @@
+from intcode.computer import Computer, Event
+
+
+class AsciiChannel:
+
+    def __init__(self, computer: Computer):
+        self.computer = computer
+        self.buffer = bytearray()
+        self.values: [int] = []
+
+    def write(self, text):
+        self.computer.inputs.extend(text.encode() if isinstance(text, str) else text)
+
+    def run(self) -> Event:
+        event = self.computer.run_until()
+        self.collect()
+        return event
+
+    def collect(self):
+        outputs = self.computer.outputs
+        try:
+            chunk = bytes(outputs)
+        except ValueError:
+            chunk = None
+        if chunk is not None and chunk.isascii():
+            self.buffer += chunk
+        else:
+            for value in outputs:
+                if 0 <= value < 128:
+                    self.buffer.append(value)
+                else:
+                    self.values.append(value)
+        outputs.clear()
+
+    def lines(self) -> [str]:
+        end = self.buffer.rfind(b'\n') + 1
+        lines = self.buffer[:end].decode().split('\n')[:-1]
+        del self.buffer[:end]
+        return lines
+
+    def frames(self) -> [str]:
+        end = self.buffer.rfind(b'\n\n') + 2 if b'\n\n' in self.buffer else 0
+        frames = self.buffer[:end].decode().split('\n\n')[:-1]
+        del self.buffer[:end]
+        return frames
+
+    def text(self) -> str:
+        text = self.buffer.decode()
+        self.buffer.clear()
+        return text
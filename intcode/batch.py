@@ -0,0 +1,85 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import islice
+
+from intcode.errors import IntcodeError
+from intcode.pool import ComputerPool
+
+try:
+    from intcode.lockstep import run_lockstep
+except ImportError:
+    run_lockstep = None
+
+Job = namedtuple('Job', ['inputs', 'patches', 'reads'], defaults=[(), {}, ()])
+Result = namedtuple('Result', ['index', 'event', 'outputs', 'values', 'error'], defaults=[None])
+
+POOL: ComputerPool = None
+LIMITS: dict = None
+
+
+def start(program: [int], engine: str, limits: dict):
+    global POOL, LIMITS
+    POOL = ComputerPool(program, 1, engine)
+    LIMITS = limits
+
+
+def run_job(pool: ComputerPool, index: int, job: Job, limits: dict = None) -> Result:
+    with pool.computer() as computer:
+        if limits is not None:
+            computer.limit(**limits)
+        try:
+            for position, value in job.patches.items():
+                computer.update_value(position, value)
+            computer.inputs.extend(job.inputs)
+            event = computer.run_until()
+        except IntcodeError as error:
+            return Result(index, None, list(computer.outputs), [], error)
+        return Result(index, event, list(computer.outputs),
+                      [computer.read_value(position) for position in job.reads])
+
+
+def run_chunk(chunk: [(int, Job)]) -> [Result]:
+    return [run_job(POOL, index, job, LIMITS) for index, job in chunk]
+
+
+def chunked(jobs, size: int):
+    jobs = iter(enumerate(jobs))
+    while True:
+        chunk = list(islice(jobs, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_batch(program: [int], jobs, workers: int = None, chunk_size: int = 64, ordered=True,
+              engine: str = None, vectorise=False, limits: dict = None):
+    if vectorise and limits is None and run_lockstep is not None:
+        jobs = list(jobs)
+        try:
+            results = run_lockstep(program, jobs)
+        except OverflowError:
+            results = None
+        if results is not None:
+            for index, result in enumerate(results):
+                yield Result(index, *result)
+            return
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        pool = ComputerPool(program, 1, engine)
+        for index, job in enumerate(jobs):
+            yield run_job(pool, index, job, limits)
+        return
+
+    executor = ProcessPoolExecutor(workers, initializer=start, initargs=(program, engine, limits))
+    try:
+        if ordered:
+            for results in executor.map(run_chunk, chunked(jobs, chunk_size)):
+                yield from results
+        else:
+            futures = [executor.submit(run_chunk, chunk) for chunk in chunked(jobs, chunk_size)]
+            for future in as_completed(futures):
+                yield from future.result()
+    finally:
+        executor.shutdown(cancel_futures=True)
@@ -0,0 +1,151 @@
+import argparse
+import gc
+import io
+import json
+import runpy
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, redirect_stdout
+
+from intcode import batch
+from intcode.computer import Computer
+
+WORKLOADS = {'day02': 'day02.computer', 'day05': 'day05.computer', 'day07': 'day07.computer',
+             'day09': 'day09.computer', 'day11': 'day11.computer', 'day13': 'day13.computer',
+             'day15': 'day15.computer', 'day17': 'day17.vision', 'day19': 'day19.computer',
+             'day21': 'day21.computer', 'day23': 'day23.network', 'day25': 'day25.droid'}
+SCRIPTS = {'day25': 'inv\nnorth\nsouth\nsouth\nnorth\neast\nwest\nwest\neast\n'}
+FILTERS = [tracemalloc.Filter(False, tracemalloc.__file__),
+           tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+           tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>')]
+
+
+@contextmanager
+def counting(counter: [int], engines: {str}):
+    resume = Computer.resume
+    run_batch = batch.run_batch
+
+    def counted(computer: Computer, wait_input=False) -> int:
+        engines.add(computer.engine)
+        steps = computer.steps
+        try:
+            return resume(computer, wait_input)
+        finally:
+            counter[0] += computer.steps - steps
+
+    def serial(program: [int], jobs, **options):
+        return run_batch(program, jobs, **{**options, 'workers': 1, 'vectorise': False})
+
+    Computer.resume = counted
+    batch.run_batch = serial
+    try:
+        yield counter
+    finally:
+        Computer.resume = resume
+        batch.run_batch = run_batch
+
+
+def run_workload(name: str) -> (int, {str}):
+    stdin = sys.stdin
+    sys.stdin = io.StringIO(SCRIPTS.get(name, ''))
+    engines = set()
+    try:
+        with counting([0], engines) as counter, redirect_stdout(io.StringIO()):
+            try:
+                runpy.run_module(WORKLOADS[name], run_name='__main__')
+            except EOFError:
+                pass
+        return counter[0], engines
+    finally:
+        sys.stdin = stdin
+
+
+def measure(name: str, repeat: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        run_workload(name)
+
+    times = []
+    collections = sum(stats['collections'] for stats in gc.get_stats())
+    for _ in range(repeat):
+        started = time.perf_counter()
+        steps, engines = run_workload(name)
+        times.append(time.perf_counter() - started)
+    collections = sum(stats['collections'] for stats in gc.get_stats()) - collections
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot().filter_traces(FILTERS)
+        run_workload(name)
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot().filter_traces(FILTERS)
+    finally:
+        tracemalloc.stop()
+    allocations = [stat for stat in after.compare_to(before, 'lineno') if stat.count_diff > 0]
+    gc.collect()
+
+    median = statistics.median(times)
+    return {'workload': name,
+            'engine': '+'.join(sorted(engines)) or '-',
+            'runs': repeat,
+            'steps': steps,
+            'median': median,
+            'min': min(times),
+            'max': max(times),
+            'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+            'steps_per_second': steps / median if median else 0.0,
+            'peak_bytes': peak,
+            'gc_collections': collections / repeat,
+            'allocated_blocks': sum(stat.count_diff for stat in allocations),
+            'allocated_bytes': sum(stat.size_diff for stat in allocations),
+            'allocation_sites': [{'site': str(stat.traceback), 'blocks': stat.count_diff,
+                                  'bytes': stat.size_diff} for stat in allocations[:5]]}
+
+
+HEADER = f'{"workload":<9}{"engine":<12}{"median":>10}{"min":>10}{"stdev":>9}{"steps":>12}' \
+         f'{"Msteps/s":>10}{"peak KiB":>10}{"blocks":>9}{"gc/run":>8}'
+
+
+def row(result: dict) -> str:
+    return f'{result["workload"]:<9}{result["engine"]:<12}' \
+           f'{result["median"] * 1000:>8.1f}ms{result["min"] * 1000:>8.1f}ms' \
+           f'{result["stdev"] * 1000:>7.1f}ms{result["steps"]:>12}' \
+           f'{result["steps_per_second"] / 1e6:>10.2f}{result["peak_bytes"] / 1024:>10.0f}' \
+           f'{result["allocated_blocks"]:>9}{result["gc_collections"]:>8.1f}'
+
+
+def report(results: [dict]) -> str:
+    total = sum(result['median'] for result in results)
+    steps = sum(result['steps'] for result in results)
+    return '\n'.join([HEADER] + [row(result) for result in results] +
+                     [f'{"total":<21}{total * 1000:>8.1f}ms{"":>19}{steps:>12}'
+                      f'{steps / total / 1e6 if total else 0:>10.2f}'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Intcode programs of every day.')
+    parser.add_argument('workloads', nargs='*', metavar='workload')
+    parser.add_argument('--engine', action='append', dest='engines')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--json')
+    arguments = parser.parse_args()
+    unknown = set(arguments.workloads) - set(WORKLOADS)
+    if unknown:
+        parser.error(f'unknown workloads: {", ".join(sorted(unknown))}')
+
+    results = []
+    for engine in arguments.engines or [Computer.default_engine]:
+        Computer.default_engine = engine
+        for name in arguments.workloads or WORKLOADS:
+            results.append(measure(name, arguments.repeat, arguments.warmup))
+            print(row(results[-1]), file=sys.stderr)
+    print(report(results))
+    if arguments.json:
+        with open(arguments.json, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
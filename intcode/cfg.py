@@ -0,0 +1,227 @@
+import sys
+from collections import namedtuple
+from importlib import import_module
+
+from intcode.computer import INSTRUCTION_LENGTHS, OPCODE_NAMES, decode
+
+WRITES = {1: 3, 2: 3, 3: 1, 7: 3, 8: 3}
+
+Op = namedtuple('Op', ['address', 'opcode', 'modes', 'operands'])
+
+
+def explore(memory: [int]) -> ({int: int}, {int}, {int}):
+    labels = {0}
+    pending = [0]
+    starts: {int: int} = {}
+    immediates = set()
+    returns = set()
+    resumes = set()
+    while pending:
+        cursor = pending.pop()
+        while 0 <= cursor < len(memory) and cursor not in starts:
+            opcode, modes, length = decode(memory[cursor])
+            if opcode not in INSTRUCTION_LENGTHS or cursor + length > len(memory):
+                break
+            starts[cursor] = length
+            if opcode in (1, 2) and modes[0] == modes[1] == 1:
+                identity = opcode - 1
+                first, second = memory[cursor + 1:cursor + 3]
+                immediates.add(second if first == identity else first)
+            following = cursor + length
+            if opcode == 99:
+                break
+            elif opcode in (5, 6):
+                if modes[1] == 1:
+                    labels.add(memory[cursor + 2])
+                    pending.append(memory[cursor + 2])
+                if modes[0] == 1 and (memory[cursor + 1] != 0) == (opcode == 5):
+                    returns.add(following)
+                    break
+                labels.add(following)
+            elif opcode == 3:
+                labels.add(following)
+            cursor = following
+
+        for position in returns & immediates:
+            resumes.add(position)
+            if position not in starts:
+                labels.add(position)
+                pending.append(position)
+        returns -= immediates
+    return starts, labels & set(starts), resumes
+
+
+def analyse(memory: [int]) -> ({int: int}, {int}, {int}):
+    starts, labels, _ = explore(memory)
+    parameters = {position for start, length in starts.items()
+                  for position in range(start + 1, start + length)}
+    dynamic = set()
+    for start in starts:
+        opcode, modes, _ = decode(memory[start])
+        if opcode in WRITES:
+            target = memory[start + WRITES[opcode]]
+            if modes[WRITES[opcode] - 1] != 2 and target in parameters and target not in starts:
+                dynamic.add(target)
+    return starts, labels, dynamic
+
+
+def operand(mode: int, value: int) -> str:
+    if mode == 1:
+        return f'#{value}'
+    elif mode == 2:
+        return f'[rb{value:+}]'
+    return f'[{value}]'
+
+
+def always(op: Op) -> bool:
+    return op.modes[0] == 1 and (op.operands[0] != 0) == (op.opcode == 5)
+
+
+class Block:
+
+    def __init__(self, start: int, ops: [Op]):
+        self.start = start
+        self.ops = ops
+        self.end = ops[-1].address + INSTRUCTION_LENGTHS[ops[-1].opcode]
+        self.successors: [int] = []
+        self.predecessors: [int] = []
+        self.call: int = None
+        self.indirect = False
+
+    @property
+    def exit(self) -> Op:
+        return self.ops[-1]
+
+    def __repr__(self):
+        return f'Block({self.start}..{self.end}, successors={self.successors})'
+
+
+class CFG:
+
+    def __init__(self, memory: [int]):
+        self.memory = memory
+        starts, labels, resumes = explore(memory)
+        self.ops: {int: Op} = {address: Op(address, *decode(memory[address])[:2],
+                                           tuple(memory[address + 1:address + length]))
+                               for address, length in sorted(starts.items())}
+        self.resumes = resumes
+        self.calls: {int: int} = {}
+        self.returns: {int} = set()
+        self.blocks: {int: Block} = {}
+
+        leaders = set(labels)
+        for op in self.ops.values():
+            if op.opcode in (5, 6) and op.modes[1] == 1 and op.operands[1] in self.ops:
+                leaders.add(op.operands[1])
+            if op.opcode in (5, 6, 99):
+                leaders.add(op.address + INSTRUCTION_LENGTHS[op.opcode])
+
+        groups: [[Op]] = []
+        for address, op in self.ops.items():
+            previous = groups[-1][-1] if groups else None
+            if previous is None or address in leaders or \
+                    address != previous.address + len(previous.operands) + 1:
+                groups.append([])
+            groups[-1].append(op)
+        for ops in groups:
+            self.blocks[ops[0].address] = Block(ops[0].address, ops)
+        for block in self.blocks.values():
+            self.link(block)
+        for block in self.blocks.values():
+            for successor in block.successors:
+                self.blocks[successor].predecessors.append(block.start)
+
+    def link(self, block: Block):
+        op = block.exit
+        following = block.end
+        if op.opcode == 99:
+            return
+        if op.opcode not in (5, 6):
+            if following in self.blocks:
+                block.successors.append(following)
+            return
+
+        if op.modes[1] == 1:
+            target = op.operands[1]
+            if always(op) and following in self.resumes:
+                block.call = target
+                self.calls[op.address] = target
+                block.successors.append(following)
+                return
+            if target in self.blocks:
+                block.successors.append(target)
+        else:
+            block.indirect = True
+            if always(op) and op.modes[1] == 2:
+                self.returns.add(block.start)
+        if not always(op) and following in self.blocks:
+            block.successors.append(following)
+
+    def data(self) -> [(int, int)]:
+        covered = [False] * len(self.memory)
+        for op in self.ops.values():
+            for position in range(op.address, op.address + len(op.operands) + 1):
+                covered[position] = True
+        regions = []
+        start = None
+        for position, code in enumerate(covered + [True]):
+            if not code and start is None:
+                start = position
+            elif code and start is not None:
+                regions.append((start, position))
+                start = None
+        return regions
+
+    def functions(self) -> {int: {int}}:
+        functions = {}
+        for entry in [0, *sorted(set(self.calls.values()))]:
+            if entry not in self.blocks:
+                continue
+            reached = set()
+            pending = [entry]
+            while pending:
+                start = pending.pop()
+                if start not in reached:
+                    reached.add(start)
+                    pending += self.blocks[start].successors
+            functions[entry] = reached
+        return functions
+
+    def text(self, op: Op) -> str:
+        operands = ', '.join(operand(mode, value) for mode, value in zip(op.modes, op.operands))
+        return f'{OPCODE_NAMES[op.opcode]:<4} {operands}'.rstrip()
+
+    def listing(self) -> str:
+        entries = {0, *self.calls.values()}
+        lines = []
+        regions = {start: end for start, end in self.data()}
+        for address in sorted(set(self.blocks) | set(regions)):
+            if address in regions:
+                values = self.memory[address:regions[address]]
+                lines += ['', f'data {address}..{regions[address]}: {values[:16]}'
+                              f'{" ..." if len(values) > 16 else ""}']
+                continue
+            block = self.blocks[address]
+            header = f'block {block.start}' + (' (entry)' if block.start in entries else '')
+            if block.predecessors:
+                header += f' <- {", ".join(map(str, sorted(block.predecessors)))}'
+            lines += ['', header]
+            lines += [f'{op.address:>8}  {self.text(op)}' for op in block.ops]
+            if block.call is not None:
+                lines.append(f'{"":>8}  ; call {block.call}, returns to {block.end}')
+            elif block.start in self.returns:
+                lines.append(f'{"":>8}  ; return')
+            elif block.indirect:
+                lines.append(f'{"":>8}  ; indirect jump')
+        return '\n'.join(lines[1:])
+
+
+def main():
+    if len(sys.argv) < 2:
+        print('usage: python -m intcode.cfg <day>')
+        sys.exit()
+    print(CFG(import_module(f'{sys.argv[1]}.input').INSTRUCTIONS).listing())
+
+
+if __name__ == '__main__':
+    main()
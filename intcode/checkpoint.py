@@ -0,0 +1,126 @@
+import struct
+
+from intcode.computer import Computer
+from intcode.errors import IntcodeError
+from intcode.memory import PAGE_SIZE, ArrayMemory, HashedMemory, PagedMemory, digest
+
+MAGIC = b'ICP1'
+HEADER = struct.Struct('<4sB')
+KINDS = [list, ArrayMemory, HashedMemory]
+
+
+def write_int(buffer: bytearray, value: int):
+    value = value << 1 if value >= 0 else (-value << 1) - 1
+    while value > 0x7f:
+        buffer.append(value & 0x7f | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def write_ints(buffer: bytearray, values: [int]):
+    write_int(buffer, len(values))
+    for value in values:
+        write_int(buffer, value)
+
+
+def write_text(buffer: bytearray, text: str):
+    encoded = text.encode()
+    write_int(buffer, len(encoded))
+    buffer += encoded
+
+
+class Reader:
+
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.offset = 0
+
+    def int(self) -> int:
+        data = self.data
+        value = 0
+        shift = 0
+        while True:
+            byte = data[self.offset]
+            self.offset += 1
+            value |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                return value >> 1 if not value & 1 else -((value + 1) >> 1)
+            shift += 7
+
+    def ints(self) -> [int]:
+        return [self.int() for _ in range(self.int())]
+
+    def text(self) -> str:
+        length = self.int()
+        if not 0 <= length <= len(self.data) - self.offset:
+            raise IndexError(f'text of {length} bytes at {self.offset}')
+        self.offset += length
+        return bytes(self.data[self.offset - length:self.offset]).decode()
+
+
+def digest_pages(pages: {int: [int]}) -> int:
+    result = 0
+    for index, page in pages.items():
+        result ^= digest(page, index * PAGE_SIZE)
+    return result
+
+
+def dump(computer: Computer) -> bytes:
+    memory = computer.memory()
+    kind = KINDS.index(type(memory)) if type(memory) in KINDS else 0
+    buffer = bytearray(HEADER.pack(MAGIC, kind))
+    write_text(buffer, computer.engine)
+    for value in (computer.cursor, computer.relative, computer.steps):
+        write_int(buffer, value)
+    write_ints(buffer, memory)
+    pages = {index: page for index, page in computer.pages.pages.items() if any(page)}
+    write_int(buffer, len(pages))
+    for index, page in sorted(pages.items()):
+        write_int(buffer, index)
+        write_ints(buffer, page)
+    write_ints(buffer, computer.inputs)
+    write_ints(buffer, computer.outputs)
+    return bytes(buffer)
+
+
+def load(data: bytes, input_handle=None, output_handle=None) -> Computer:
+    try:
+        return parse(data, input_handle, output_handle)
+    except (IndexError, ValueError, OverflowError, struct.error) as error:
+        raise IntcodeError(f'corrupt checkpoint: {error}') from error
+
+
+def parse(data: bytes, input_handle=None, output_handle=None) -> Computer:
+    magic, kind = HEADER.unpack_from(data)
+    if magic != MAGIC or kind >= len(KINDS):
+        raise IntcodeError(f'not an intcode checkpoint: {magic}')
+    reader = Reader(data)
+    reader.offset = HEADER.size
+    engine = reader.text()
+    cursor, relative, steps = reader.int(), reader.int(), reader.int()
+
+    computer = Computer(KINDS[kind](reader.ints()), input_handle, output_handle,
+                        relative=relative, cursor=cursor, engine=engine)
+    computer.steps = steps
+    pages = {}
+    for _ in range(reader.int()):
+        index = reader.int()
+        pages[index] = reader.ints()
+        if len(pages[index]) != PAGE_SIZE:
+            raise IntcodeError(f'corrupt checkpoint page: {index}')
+    computer.pages = PagedMemory(pages)
+    computer.pages.owned.update(pages)
+    computer.pages.digest = digest_pages(pages)
+    computer.inputs.extend(reader.ints())
+    computer.outputs.extend(reader.ints())
+    return computer
+
+
+def save(computer: Computer, path: str):
+    with open(path, 'wb') as file:
+        file.write(dump(computer))
+
+
+def restore(path: str, input_handle=None, output_handle=None) -> Computer:
+    with open(path, 'rb') as file:
+        return load(file.read(), input_handle, output_handle)
@@ -1,5 +1,34 @@
 import sys
+import time
 from abc import abstractmethod
+from collections import deque
+from enum import IntFlag
+from importlib import import_module
+
+from intcode.errors import IntcodeError
+from intcode.limits import UNMETERED, Limits, Usage
+from intcode.memory import (DENSE_BITS, DENSE_MASK, PAGE_BITS, PAGE_SIZE, HashedMemory, Overlay,
+                            PagedMemory, compact, digest, like, zobrist)
+
+ENGINES = {'dispatch': 'intcode.dispatch', 'jit': 'intcode.jit', 'aot': 'intcode.transpiler',
+           'fused': 'intcode.fusion', 'profile': 'intcode.profiler', 'trace': 'intcode.tracer',
+           'hooks': 'intcode.hooks'}
+
+HALT = -1
+WAIT = -2
+SUSPEND = -4
+BREAK = -5
+
+
+class Event(IntFlag):
+    HALT = 1
+    INPUT = 2
+    OUTPUT = 4
+    BREAK = 8
+
+
+class Suspend(Exception):
+    pass
 
 
 def generate_parameters(computer: 'Computer', start: int, modes: [bool], count: int):
@@ -14,6 +43,19 @@ def get_relative(computer: 'Computer', start, j):
     return computer.read_value(computer.relative + computer.read_value(start + 1 + j))
 
 
+INSTRUCTION_LENGTHS = {1: 4, 2: 4, 3: 2, 4: 2, 5: 3, 6: 3, 7: 4, 8: 4, 9: 2, 99: 1}
+OPCODE_NAMES = {1: 'add', 2: 'mul', 3: 'in', 4: 'out', 5: 'jt', 6: 'jf', 7: 'lt', 8: 'eq', 9: 'arb',
+                99: 'halt'}
+
+
+def decode(instruction: int) -> (int, (int, int, int), int):
+    if instruction < 0:
+        return instruction, (0, 0, 0), 1
+    value = instruction % 100
+    modes = (instruction // 100 % 10, instruction // 1000 % 10, instruction // 10000 % 10)
+    return value, modes, INSTRUCTION_LENGTHS.get(value, 1)
+
+
 def parse_raw(instruction: int) -> (int, [int]):
     string = str(instruction)
     value = int(string[-2:]) if len(string) > 1 else int(string[:2])
@@ -35,91 +77,312 @@ class Instruction:
 
 
 class Computer:
+    default_engine = 'instruction'
 
     def __init__(self, instructions: [int], input_handle, output_handle, debug=False, relative=0,
-                 cursor=0):
-        self._instructions = instructions
+                 cursor=0, engine: str = None, packed=False):
+        self._instructions = compact(instructions) if packed else instructions
+        self.pages = PagedMemory()
+        self.engine = engine or self.default_engine
 
         self.relative = relative
         self.cursor = cursor
+        self.steps = 0
+        self.seconds = 0.0
+        self.peak = len(instructions)
+        self.limits: Limits = None
+        self.meter = UNMETERED
+        self.profile = None
+        self.tracer = None
+        self.hooks = None
 
         self.input_handle = input_handle
         self.output_handle = output_handle
+        self.inputs: deque = deque()
+        self.outputs: deque = deque()
 
         self.debug = debug
 
+        self._decoded: {int: (int, (int, int, int), int)} = {}
+        self._overlay: Overlay = None
+        self._digest: int = None
+        self.image: [int] = None
+        self.compiled = None
+
+    def program(self) -> [int]:
+        if self.image is None:
+            self.image = self.memory().copy()
+        return self.image
+
+    def memory(self) -> [int]:
+        return self._instructions if self._overlay is None else self._overlay.flatten()
+
+    def decode(self, position: int) -> (int, (int, int, int), int):
+        decoded = self._decoded.get(position)
+        if decoded is None:
+            memory = self._instructions if self._overlay is None else self._overlay
+            decoded = self._decoded[position] = decode(memory[position])
+        return decoded
+
     def execute(self, wait_input=False):
+        if self.resume(wait_input) == WAIT:
+            raw = self.decode(self.cursor)
+            instruction = InputInstruction(self, self.cursor, self.input_handle)
+            self.steps += 1
+            self.cursor += raw[2]
+            return instruction, raw[1]
+
+    def resume(self, wait_input=False) -> int:
+        started = time.monotonic()
+        try:
+            engine = 'trace' if self.debug else \
+                'hooks' if self.hooks is not None and self.hooks.active() else self.engine
+            if engine in ENGINES:
+                if self._overlay is not None:
+                    self.own()
+                self._digest = None
+                return import_module(ENGINES[engine]).execute(self, wait_input)
+            return self.interpret(wait_input)
+        finally:
+            self.seconds += time.monotonic() - started
+
+    def interpret(self, wait_input=False) -> int:
         while self.cursor < len(self._instructions):
-            raw = parse_raw(self._instructions[self.cursor])
-            if raw[0] == 1:
-                instruction = AddInstruction(self, self.cursor)
-            elif raw[0] == 2:
-                instruction = MultiplyInstruction(self, self.cursor)
-            elif raw[0] == 3:
-                instruction = InputInstruction(self, self.cursor, self.input_handle)
-                if wait_input:
-                    self.cursor += len(instruction)
-                    return instruction, raw[1]
-            elif raw[0] == 4:
-                instruction = OutputInstruction(self, self.cursor, self.output_handle)
-            elif raw[0] == 5:
-                instruction = JumpIfTrueInstruction(self, self.cursor)
-            elif raw[0] == 6:
-                instruction = JumpIfFalseInstruction(self, self.cursor)
-            elif raw[0] == 7:
-                instruction = LessThanInstruction(self, self.cursor)
-            elif raw[0] == 8:
-                instruction = EqualsInstructions(self, self.cursor)
-            elif raw[0] == 9:
-                instruction = AdjustRelativeInstruction(self, self.cursor)
-            elif raw[0] == 99:
-                if self.debug:
-                    print('Bye!')
-                    print(self)
+            if self.steps >= self.meter:
+                try:
+                    self.check()
+                except Suspend:
+                    return SUSPEND
+            raw = self.decode(self.cursor)
+            if raw[0] == 3 and wait_input and not self.inputs:
+                return WAIT
+            self.steps += 1
+            if raw[0] == 99:
+                return HALT
+
+            if raw[0] == 3 and wait_input:
+                self.feed(self.inputs.popleft())
+                continue
+            instruction = self.instruction(raw[0])
+            try:
+                cursor_move = instruction.execute(raw[1])
+            except Suspend:
+                return SUSPEND
+            self.cursor = cursor_move if cursor_move is not None else self.cursor + raw[2]
+        return HALT
+
+    def run_until(self, events: Event = Event.INPUT | Event.HALT) -> Event:
+        output_handle = self.output_handle
+        self.output_handle = self.emit if Event.OUTPUT in events else self.outputs.append
+        try:
+            status = self.resume(True)
+            if status == SUSPEND:
+                return Event.OUTPUT
+            elif status == BREAK:
+                return Event.BREAK
+            return Event.INPUT if status == WAIT else Event.HALT
+        finally:
+            self.output_handle = output_handle
+
+    def run(self):
+        while True:
+            event = self.run_until(Event.OUTPUT)
+            while self.outputs:
+                value = yield self.outputs.popleft()
+                if value is not None:
+                    self.inputs.append(value)
+            if event == Event.HALT:
                 return
-            else:
-                print(f'ERROR: could not read: {self.cursor} {raw}')
-                if self.debug:
-                    print(self)
-                sys.exit()
-
-            if self.debug:
-                print(f'Executing: {instruction} at {self.cursor}')
-
-            cursor_move = instruction.execute(raw[1])
-            self.cursor = (
-                cursor_move if cursor_move is not None else self.cursor + len(instruction))
-        if self.debug:
-            print(self)
+            elif event == Event.INPUT and not self.inputs:
+                value = yield None
+                if value is not None:
+                    self.inputs.append(value)
+
+    def instrument(self):
+        if self.hooks is None:
+            self.hooks = import_module(ENGINES['hooks']).Hooks(self)
+        return self.hooks
+
+    def limit(self, steps: int = None, cells: int = None, seconds: float = None):
+        self.limits = Limits(steps, cells, seconds)
+        self.meter = 0
+
+    def check(self) -> int:
+        self.meter = self.limits.meter(self.steps) if self.limits is not None else UNMETERED
+        return self.meter
+
+    def usage(self) -> Usage:
+        return Usage(self.steps, len(self._instructions) + len(self.pages), self.peak, self.seconds)
+
+    def emit(self, value: int):
+        self.outputs.append(value)
+        raise Suspend()
+
+    def feed(self, value: int):
+        raw = self.decode(self.cursor)
+        position = self.read_value(self.cursor + 1)
+        self.update_value(position + self.relative if raw[1][0] == 2 else position, value)
+        self.cursor += raw[2]
+
+    def step(self) -> int:
+        raw = self.decode(self.cursor)
+        cursor_move = self.instruction(raw[0]).execute(raw[1])
+        return cursor_move if cursor_move is not None else self.cursor + raw[2]
+
+    def instruction(self, opcode: int) -> Instruction:
+        if opcode == 1:
+            return AddInstruction(self, self.cursor)
+        elif opcode == 2:
+            return MultiplyInstruction(self, self.cursor)
+        elif opcode == 3:
+            return InputInstruction(self, self.cursor, self.input_handle)
+        elif opcode == 4:
+            return OutputInstruction(self, self.cursor, self.output_handle)
+        elif opcode == 5:
+            return JumpIfTrueInstruction(self, self.cursor)
+        elif opcode == 6:
+            return JumpIfFalseInstruction(self, self.cursor)
+        elif opcode == 7:
+            return LessThanInstruction(self, self.cursor)
+        elif opcode == 8:
+            return EqualsInstructions(self, self.cursor)
+        elif opcode == 9:
+            return AdjustRelativeInstruction(self, self.cursor)
+        self.fail(self.cursor)
+
+    def fail(self, position: int):
+        raise IntcodeError(f'could not read: {position} {parse_raw(self.read_value(position))}')
 
     def read_value(self, position: int) -> int:
         if position < 0:
-            print(f'ERROR: tried to access invalid slot: {position}')
-            sys.exit()
+            raise IntcodeError(f'tried to access invalid slot: {position}')
 
         if position < len(self._instructions):
+            if self._overlay is not None:
+                page = self._overlay.pages.get(position >> DENSE_BITS)
+                if page is not None:
+                    return page[position & DENSE_MASK]
             return self._instructions[position]
         else:
-            return 0
+            return self.pages.read(position)
 
     def update_value(self, position: int, value_position: int) -> None:
         if position < 0:
-            print(f'ERROR: tried to access invalid slot: {position}')
-            sys.exit()
-        if position >= len(self._instructions):
-            self._instructions.extend([0 for _ in range(0, position - len(self._instructions) + 1)])
-
-        if self.debug:
-            print(f'Updating: {position} -> {value_position}')
-
-        self._instructions[position] = value_position
+            raise IntcodeError(f'tried to access invalid slot: {position}')
+
+        try:
+            self.store(position, value_position)
+        except OverflowError:
+            self._instructions = self._instructions.tolist()
+            self.store(position, value_position)
+        self._decoded.pop(position, None)
+        if self.compiled is not None and position in self.compiled.guard:
+            self.compiled.invalidate(position)
+        if self.hooks is not None and position in self.hooks.watchpoints:
+            self.hooks.changed()
+
+    def store(self, position: int, value: int):
+        size = len(self._instructions)
+        if position < size:
+            if self._overlay is None:
+                previous = self._instructions[position]
+                self._instructions[position] = value
+            else:
+                previous = self._overlay[position]
+                self._overlay.write(position, value)
+            if self._digest is not None and previous != value:
+                self._digest ^= zobrist(position, previous) ^ zobrist(position, value)
+        elif self._overlay is None and position - size < PAGE_SIZE:
+            self.grow(position + 1 + len(self.pages))
+            values = self.pages.take(size, position + 1)
+            values[-1] = value
+            self._instructions.extend(values)
+            self.pages.release(size, position + 1)
+            if self._digest is not None:
+                self._digest ^= digest(values, size)
+        else:
+            if position >> PAGE_BITS not in self.pages.pages:
+                self.grow(size + len(self.pages) + PAGE_SIZE)
+            self.pages.write(position, value)
+
+    def grow(self, cells: int):
+        if self.profile is not None:
+            self.profile.growth.append((self.cursor, cells))
+        if cells > self.peak:
+            if self.limits is not None:
+                self.limits.reserve(cells)
+            self.peak = cells
 
     def copy(self):
-        return Computer(self._instructions.copy(), self.input_handle, self.output_handle,
-                        self.debug, self.relative, self.cursor)
+        computer = Computer(self.memory().copy(), self.input_handle, self.output_handle,
+                            self.debug, self.relative, self.cursor, self.engine)
+        computer.pages = self.pages.copy()
+        computer._decoded = self._decoded.copy()
+        computer.inputs.extend(self.inputs)
+        computer.outputs.extend(self.outputs)
+        computer.steps = self.steps
+        computer.peak = self.peak
+        computer.image = self.image
+        computer.compiled = self.compiled.fork() if self.compiled is not None else None
+        computer._digest = self._digest
+        return computer
+
+    def fork(self) -> 'Computer':
+        computer = Computer(self._instructions, self.input_handle, self.output_handle, self.debug,
+                            self.relative, self.cursor, self.engine)
+        if self._overlay is None:
+            self._overlay = Overlay(self._instructions)
+        computer._overlay = self._overlay.fork()
+        computer.pages = self.pages.fork()
+        computer._decoded = self._decoded.copy()
+        computer.inputs.extend(self.inputs)
+        computer.outputs.extend(self.outputs)
+        computer.steps = self.steps
+        computer.peak = self.peak
+        computer.image = self.image
+        computer.compiled = self.compiled.fork() if self.compiled is not None else None
+        computer._digest = self._digest
+        return computer
+
+    def reset(self, image: [int]):
+        if self._overlay is None and type(self._instructions) is type(image):
+            self._instructions[:] = image
+        else:
+            if self._overlay is not None:
+                self._overlay.release()
+                self._overlay = None
+            self._instructions = like(self._instructions, image)
+        self.pages = PagedMemory()
+        self.relative = 0
+        self.cursor = 0
+        self.steps = 0
+        self.seconds = 0.0
+        self.peak = len(self._instructions)
+        self.limits = None
+        self.meter = UNMETERED
+        self.profile = None
+        self.hooks = None
+        if self.tracer is not None:
+            self.tracer.clear()
+        self.inputs.clear()
+        self.outputs.clear()
+        self._decoded.clear()
+        self._digest = None
+        self.image = image
+        self.compiled = self.compiled.rebase(image) if self.compiled is not None else None
+
+    def fingerprint(self) -> int:
+        if self._digest is None:
+            memory = self.memory()
+            self._digest = memory.digest if isinstance(memory, HashedMemory) else digest(memory)
+        return hash((self._digest ^ self.pages.digest, self.cursor, self.relative))
+
+    def own(self):
+        self._instructions = self._overlay.flatten(own=True)
+        self._overlay = None
 
     def __str__(self):
-        return str(self._instructions)
+        return str(self.memory())
 
 
 class AddInstruction(Instruction):
@@ -172,7 +435,7 @@ class InputInstruction(Instruction):
         self._computer.update_value(position, self.input_handle())
 
     def copy(self):
-        return InputInstruction(self._computer.copy(), self._start_position, self.input_handle)
+        return InputInstruction(self._computer.fork(), self._start_position, self.input_handle)
 
     def __len__(self):
         return 2
@@ -187,7 +450,11 @@ class OutputInstruction(Instruction):
 
     def execute(self, modes: [int]) -> None:
         parameters = generate_parameters(self._computer, self._start_position, modes, 1)
-        self.output_handle(parameters[0])
+        try:
+            self.output_handle(parameters[0])
+        except Suspend:
+            self._computer.cursor = self._start_position + 2
+            raise
 
     def __len__(self):
         return 2
@@ -0,0 +1,212 @@
+from intcode.computer import HALT, SUSPEND, WAIT, Computer, Suspend, decode
+
+RELOAD = -3
+
+READ_COUNTS = {1: 2, 2: 2, 4: 1, 5: 2, 6: 2, 7: 2, 8: 2, 9: 1}
+
+
+def parameter(offset: int) -> str:
+    return f'memory[cursor + {offset}]'
+
+
+def address(mode: int, offset: int) -> str:
+    if mode == 2:
+        return f'computer.relative + {parameter(offset)}'
+    return parameter(offset)
+
+
+def operand(mode: int, offset: int) -> (str, str):
+    if mode == 1:
+        return f'p{offset} = {parameter(offset)}', ''
+    return (f'a{offset} = {address(mode, offset)}',
+            f'p{offset} = memory[a{offset}] if 0 <= a{offset} < len(memory) '
+            f'else computer.read_value(a{offset})')
+
+
+def target(mode: int, offset: int) -> str:
+    return f't = {address(mode, offset)}'
+
+
+def store(value: str, following: str, guarded: bool = False) -> [str]:
+    lines = ['if 0 <= t < len(memory):',
+             '    try:',
+             f'        memory[t] = {value}',
+             '    except OverflowError:',
+             f'        return spill(computer, memory, t, {value}, {following})',
+             'else:',
+             f'    return spill(computer, memory, t, {value}, {following})']
+    if guarded:
+        lines[5:5] = ['    if t in computer.compiled.guard:',
+                      '        computer.compiled.invalidate(t)',
+                      f'        return {following}']
+    return lines
+
+
+def spill(computer: Computer, memory, position: int, value: int, following: int) -> int:
+    computer.update_value(position, value)
+    if memory is computer._instructions:
+        return following
+    computer.cursor = following
+    return RELOAD
+
+
+def generate_body(raw: int, wait_input: bool, guarded: bool = False) -> [str]:
+    opcode, modes, length = decode(raw)
+    reads = []
+    for offset in range(1, READ_COUNTS.get(opcode, 0) + 1):
+        reads.extend(operand(modes[offset - 1], offset))
+    body = [line for line in reads if line]
+    following = f'cursor + {length}'
+
+    if opcode == 1:
+        body += [target(modes[2], 3)] + store('p1 + p2', following, guarded) + \
+            [f'return {following}']
+    elif opcode == 2:
+        body += [target(modes[2], 3)] + store('p1 * p2', following, guarded) + \
+            [f'return {following}']
+    elif opcode == 3:
+        if wait_input:
+            body += ['inputs = computer.inputs',
+                     'if not inputs:',
+                     f'    return {WAIT}',
+                     target(modes[0], 1),
+                     'value = inputs.popleft()']
+        else:
+            body += [target(modes[0], 1), 'value = computer.input_handle()']
+        body += store('value', following, guarded) + [f'return {following}']
+    elif opcode == 4:
+        body += ['try:',
+                 '    computer.output_handle(p1)',
+                 'except Suspend:',
+                 f'    computer.cursor = {following}',
+                 '    raise',
+                 f'return {following}']
+    elif opcode == 5:
+        body += [f'return p2 if p1 != 0 else {following}']
+    elif opcode == 6:
+        body += [f'return p2 if p1 == 0 else {following}']
+    elif opcode == 7:
+        body += [target(modes[2], 3)] + store('1 if p1 < p2 else 0', following, guarded) + \
+            [f'return {following}']
+    elif opcode == 8:
+        body += [target(modes[2], 3)] + store('1 if p1 == p2 else 0', following, guarded) + \
+            [f'return {following}']
+    elif opcode == 9:
+        body += ['computer.relative += p1', f'return {following}']
+    elif opcode == 99:
+        body += [f'return {HALT}']
+    else:
+        body += ['computer.fail(cursor)']
+    return body
+
+
+def generate_source(raw: int, wait_input: bool, guarded: bool = False) -> str:
+    return '\n'.join(['def handler(computer, memory, cursor):'] +
+                     [f'    {line}' for line in generate_body(raw, wait_input, guarded)])
+
+
+def compile_handler(raw: int, wait_input: bool, guarded: bool = False):
+    namespace = {'spill': spill, 'Suspend': Suspend}
+    exec(compile(generate_source(raw, wait_input, guarded), f'<intcode {raw}>', 'exec'),
+         namespace)
+    return namespace['handler']
+
+
+class HandlerTable(dict):
+
+    def __init__(self, wait_input: bool, guarded: bool = False):
+        super().__init__()
+        self.wait_input = wait_input
+        self.guarded = guarded
+
+    def __missing__(self, raw: int):
+        handler = self[raw] = compile_handler(raw, self.wait_input, self.guarded)
+        return handler
+
+
+TABLES = {(wait_input, guarded): HandlerTable(wait_input, guarded)
+          for wait_input in (False, True) for guarded in (False, True)}
+
+
+class LengthTable(dict):
+
+    def __missing__(self, raw: int) -> int:
+        length = self[raw] = decode(raw)[2]
+        return length
+
+
+LENGTHS = LengthTable()
+
+
+def pause(computer: Computer, cursor: int) -> int:
+    computer.cursor = cursor
+    return WAIT
+
+
+DISPATCH = ['instruction = memory[cursor]',
+            'if cursor + 4 > size and cursor + LENGTHS[instruction] > len(memory):',
+            '    computer.cursor = cursor',
+            '    following = computer.step()',
+            '    memory = computer._instructions',
+            '    size = len(memory)',
+            'else:',
+            '    following = handlers[instruction](computer, memory, cursor)']
+
+
+def indent(lines: [str], depth: int) -> [str]:
+    return ['    ' * depth + line for line in lines]
+
+
+def generate_loop(arguments: [str] = (), guarded=False, setup: [str] = (), before: [str] = (),
+                  after: [str] = (), dispatch: [str] = DISPATCH) -> str:
+    return '\n'.join([f'def run({", ".join(["computer", "wait_input", *arguments])}):',
+                      '    memory = computer._instructions',
+                      '    size = len(memory)',
+                      f'    handlers = TABLES[wait_input, {guarded}]',
+                      '    cursor = computer.cursor',
+                      '    steps = 0',
+                      '    budget = computer.meter - computer.steps'] +
+                     indent(setup, 1) +
+                     ['    try:',
+                      '        while cursor < size or cursor < len(memory):',
+                      '            if steps >= budget:',
+                      '                computer.cursor = cursor',
+                      '                computer.steps += steps',
+                      '                steps = 0',
+                      '                budget = computer.check() - computer.steps'] +
+                     indent(before, 3) +
+                     ['            steps += 1'] +
+                     indent(dispatch, 3) +
+                     indent(after, 3) +
+                     ['            if following < 0:',
+                      f'                if following == {WAIT}:',
+                      '                    steps -= 1',
+                      '                    return pause(computer, cursor)',
+                      f'                elif following == {RELOAD}:',
+                      '                    memory = computer._instructions',
+                      '                    size = len(memory)',
+                      '                    cursor = computer.cursor',
+                      '                    continue',
+                      '                break',
+                      '            cursor = following',
+                      '    except Suspend:',
+                      f'        return {SUSPEND}',
+                      '    finally:',
+                      '        computer.steps += steps',
+                      '        computer._decoded.clear()',
+                      '    computer.cursor = cursor',
+                      f'    return {HALT}'])
+
+
+def compile_loop(name: str, namespace: dict = None, **fragments):
+    scope = {'TABLES': TABLES, 'LENGTHS': LENGTHS, 'Suspend': Suspend, 'pause': pause,
+             **(namespace or {})}
+    exec(compile(generate_loop(**fragments), f'<{name} loop>', 'exec'), scope)
+    return scope['run']
+
+
+LOOP = compile_loop('dispatch')
+
+
+def execute(computer: Computer, wait_input=False):
+    return LOOP(computer, wait_input)
@@ -0,0 +1,2 @@
+class IntcodeError(Exception):
+    pass
@@ -0,0 +1,114 @@
+from intcode import dispatch
+from intcode.cfg import analyse
+from intcode.computer import Computer, Suspend, decode
+from intcode.dispatch import DISPATCH, TABLES, compile_loop, generate_body, spill
+
+MAX_CACHED_PROGRAMS = 64
+MAX_RUN = 4
+STRAIGHT = {1, 2, 7, 8, 9}
+FUSIBLE = STRAIGHT | {5, 6}
+
+FUSION_CACHE: {(int, ...): 'Fusion'} = {}
+
+
+def generate_source(words: (int, ...)) -> str:
+    body = []
+    for raw in words[:-1]:
+        body += generate_body(raw, False, True)[:-1] + \
+            ['computer.steps += 1', f'cursor += {decode(raw)[2]}']
+    body += generate_body(words[-1], False, True)
+    return '\n'.join(['def handler(computer, memory, cursor):'] + [f'    {line}' for line in body])
+
+
+def compile_fused(words: (int, ...)):
+    namespace = {'spill': spill, 'Suspend': Suspend}
+    name = f'<intcode {" ".join(map(str, words))}>'
+    exec(compile(generate_source(words), name, 'exec'), namespace)
+    return namespace['handler']
+
+
+class FusedTable(dict):
+
+    def __missing__(self, words: (int, ...)):
+        handler = self[words] = compile_fused(words)
+        return handler
+
+
+FUSED = FusedTable()
+
+
+def straight(image: [int], starts: {int}, cursor: int) -> [int]:
+    cells = [cursor]
+    while len(cells) < MAX_RUN and decode(image[cells[-1]])[0] in STRAIGHT:
+        following = cells[-1] + decode(image[cells[-1]])[2]
+        if following not in starts or decode(image[following])[0] not in FUSIBLE:
+            break
+        cells.append(following)
+    return cells
+
+
+class Fusion:
+
+    def __init__(self, image: [int]):
+        self.image = image
+        self.code: {int: 'function'} = {}
+        self.guard: {int: [int]} = {}
+        self.fused = 0
+        starts, _, _ = analyse(image)
+        for cursor in sorted(starts):
+            if decode(image[cursor])[0] == 3:
+                continue
+            cells = straight(image, starts, cursor)
+            if len(cells) > 1:
+                self.code[cursor] = FUSED[tuple(image[cell] for cell in cells)]
+                self.fused += 1
+            else:
+                self.code[cursor] = TABLES[False, True][image[cursor]]
+            for cell in cells:
+                self.guard.setdefault(cell, []).append(cursor)
+
+    def attach(self, memory: [int]) -> 'Fusion':
+        if len(memory) < len(self.image):
+            return None
+        for position in [position for position in self.guard
+                         if memory[position] != self.image[position]]:
+            self.invalidate(position)
+        return self
+
+    def fork(self) -> 'Fusion':
+        return self
+
+    def rebase(self, image: [int]) -> 'Fusion':
+        return self if image is self.image or image == self.image else None
+
+    def invalidate(self, position: int):
+        for cursor in self.guard.pop(position, ()):
+            self.code.pop(cursor, None)
+
+
+def load(image: [int]) -> Fusion:
+    key = tuple(image)
+    fusion = FUSION_CACHE.get(key)
+    if fusion is None:
+        if len(FUSION_CACHE) >= MAX_CACHED_PROGRAMS:
+            FUSION_CACHE.clear()
+        fusion = FUSION_CACHE[key] = Fusion(image)
+    return fusion
+
+
+LOOP = compile_loop('fusion', arguments=['fusion'], guarded=True, setup=['code = fusion.code'],
+                    dispatch=['handler = code.get(cursor)',
+                              'if handler is not None:',
+                              '    following = handler(computer, memory, cursor)',
+                              'else:'] + [f'    {line}' for line in DISPATCH])
+METERED = compile_loop('fusion metered', arguments=['fusion'], guarded=True)
+
+
+def execute(computer: Computer, wait_input=False):
+    if not isinstance(computer.compiled, Fusion):
+        computer.compiled = load(computer.program()).attach(computer._instructions)
+    if computer.compiled is None:
+        return dispatch.execute(computer, wait_input)
+    if computer.limits is not None:
+        return METERED(computer, wait_input, computer.compiled)
+    return LOOP(computer, wait_input, computer.compiled)
@@ -0,0 +1,90 @@
+from intcode.computer import BREAK, Computer
+from intcode.dispatch import compile_loop
+
+
+def stop(computer: Computer) -> bool:
+    return True
+
+
+class Hooks:
+
+    def __init__(self, computer: Computer):
+        self.computer = computer
+        self.breakpoints: {int: callable} = {}
+        self.watchpoints: {int: callable} = {}
+        self.values: {int: int} = {}
+        self.callbacks: [callable] = []
+        self.paused: int = None
+
+    def active(self) -> bool:
+        return bool(self.breakpoints or self.watchpoints or self.callbacks)
+
+    def break_at(self, address: int, callback=stop):
+        self.breakpoints[address] = callback
+
+    def watch(self, address: int, callback):
+        self.watchpoints[address] = callback
+        self.values[address] = self.computer.read_value(address)
+
+    def on_step(self, callback):
+        self.callbacks.append(callback)
+
+    def remove(self, address: int):
+        self.breakpoints.pop(address, None)
+        self.watchpoints.pop(address, None)
+        self.values.pop(address, None)
+
+    def clear(self):
+        self.breakpoints.clear()
+        self.watchpoints.clear()
+        self.values.clear()
+        self.callbacks.clear()
+        self.paused = None
+
+    def changed(self):
+        for position, previous in list(self.values.items()):
+            value = self.computer.read_value(position)
+            if value != previous and position in self.values:
+                self.values[position] = value
+                self.watchpoints[position](self.computer, position, previous, value)
+
+
+def compile_hooks(breakpoints: bool, callbacks: bool, watchpoints: bool, guarded: bool):
+    before = []
+    after = []
+    if breakpoints:
+        before += ['if cursor in breakpoints and not resumed:',
+                   '    computer.cursor = cursor',
+                   '    if breakpoints[cursor](computer):',
+                   '        hooks.paused = cursor',
+                   f'        return {BREAK}',
+                   'resumed = False']
+    if callbacks:
+        before += ['computer.cursor = cursor',
+                   'for callback in callbacks:',
+                   '    callback(computer)']
+    if watchpoints:
+        after += ['if any(computer.read_value(p) != v for p, v in values.items()):',
+                  '    computer.cursor = cursor if following < 0 else following',
+                  '    hooks.changed()']
+    return compile_loop(f'hooks {breakpoints} {callbacks} {watchpoints} {guarded}',
+                        arguments=['hooks'], guarded=guarded,
+                        setup=['breakpoints = hooks.breakpoints',
+                               'callbacks = hooks.callbacks',
+                               'values = hooks.values',
+                               'resumed = hooks.paused == cursor',
+                               'hooks.paused = None'],
+                        before=before, after=after)
+
+
+LOOPS = {(breakpoints, callbacks, watchpoints, guarded):
+         compile_hooks(breakpoints, callbacks, watchpoints, guarded)
+         for breakpoints in (False, True) for callbacks in (False, True)
+         for watchpoints in (False, True) for guarded in (False, True)}
+
+
+def execute(computer: Computer, wait_input=False):
+    hooks = computer.hooks
+    loop = LOOPS[bool(hooks.breakpoints), bool(hooks.callbacks), bool(hooks.watchpoints),
+                 computer.compiled is not None]
+    return loop(computer, wait_input, hooks)
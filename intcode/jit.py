@@ -0,0 +1,268 @@
+from intcode.computer import Computer, Suspend, decode
+from intcode.dispatch import READ_COUNTS, RELOAD, compile_loop, spill
+from intcode.loops import accelerate, counting_loop
+
+THRESHOLD = 16
+MAX_BLOCK_LENGTH = 64
+MAX_VARIANTS = 8
+COMPILABLE = {1, 2, 4, 5, 6, 7, 8, 9}
+
+BLOCK_CACHE: {int: ['Block']} = {}
+HEAT: {int: int} = {}
+PATCHED: {int} = set()
+
+
+class BlockBuilder:
+    max_length = MAX_BLOCK_LENGTH
+
+    def __init__(self, memory, start: int, dynamic: {int}):
+        self.memory = memory
+        self.start = start
+        self.cursor = start
+        self.dynamic = dynamic
+        self.required = 0
+        self.terminated = False
+        self.count = 0
+        self.guarded: [int] = []
+        self.opcodes: {int} = set()
+        self.lines = self.prologue()
+
+    def require(self, position: int):
+        self.required = max(self.required, position + 1)
+
+    def constant_address(self, position: int) -> str:
+        if position < len(self.memory):
+            self.require(position)
+            return f'memory[{position}]'
+        return f'computer.read_value({position})'
+
+    def parameter(self, position: int) -> str:
+        if position in self.dynamic:
+            self.require(position)
+            return f'memory[{position}]'
+        self.guarded.append(position)
+        return str(self.memory[position])
+
+    def operand(self, name: str, mode: int, position: int) -> [str]:
+        parameter = self.parameter(position)
+        if mode == 1:
+            return [f'{name} = {parameter}']
+        elif mode == 0 and position not in self.dynamic:
+            return [f'{name} = {self.constant_address(int(parameter))}']
+        return [f'a = rb + {parameter}' if mode == 2 else f'a = {parameter}',
+                f'{name} = memory[a] if 0 <= a < len(memory) else computer.read_value(a)']
+
+    def prologue(self) -> [str]:
+        return ['guard = compiled.guard', 'rb = computer.relative']
+
+    def exit(self, following: str) -> [str]:
+        return ['computer.relative = rb', f'computer.steps += {self.count}', f'return {following}']
+
+    def deoptimize(self, following: int) -> [str]:
+        return ['compiled.invalidate(t)'] + self.exit(str(following))
+
+    def reload(self) -> [str]:
+        return self.exit(str(RELOAD))
+
+    def spill(self, value: str, following: int) -> [str]:
+        return [f'if spill(computer, memory, t, {value}, {following}) == {RELOAD}:'] + \
+            [f'    {line}' for line in self.reload()]
+
+    def store(self, mode: int, position: int, value: str, following: int) -> [str]:
+        parameter = self.parameter(position)
+        spill = self.spill(value, following)
+        write = ['try:', f'    memory[t] = {value}', 'except OverflowError:'] + \
+            [f'    {line}' for line in spill] + \
+            ['if t in guard:'] + [f'    {line}' for line in self.deoptimize(following)]
+        if mode != 2 and position not in self.dynamic:
+            if int(parameter) >= len(self.memory):
+                return [f't = {parameter}'] + spill
+            self.require(int(parameter))
+            return [f't = {parameter}'] + write
+        return [f't = rb + {parameter}' if mode == 2 else f't = {parameter}',
+                'if 0 <= t < len(memory):'] + [f'    {line}' for line in write] + \
+            ['else:'] + [f'    {line}' for line in spill]
+
+    def instruction(self) -> bool:
+        memory = self.memory
+        cursor = self.cursor
+        if cursor >= len(memory):
+            return False
+        opcode, modes, length = decode(memory[cursor])
+        if opcode not in COMPILABLE or max(modes) > 2 or cursor + length > len(memory):
+            return False
+        fixed = [position not in self.dynamic for position in range(cursor + 1, cursor + length)]
+        parameters = memory[cursor + 1:cursor + length]
+        if any(fixed[i] and modes[i] == 0 and parameters[i] < 0
+               for i in range(READ_COUNTS[opcode])) or \
+                opcode in (1, 2, 7, 8) and fixed[2] and modes[2] != 2 and parameters[2] < 0:
+            return False
+
+        self.opcodes.add(cursor)
+        self.guarded.append(cursor)
+        self.count += 1
+        lines = []
+        for i in range(READ_COUNTS[opcode]):
+            lines += self.operand(f'p{i + 1}', modes[i], cursor + 1 + i)
+        following = cursor + length
+        if opcode == 1:
+            lines += self.store(modes[2], cursor + 3, 'p1 + p2', following)
+        elif opcode == 2:
+            lines += self.store(modes[2], cursor + 3, 'p1 * p2', following)
+        elif opcode == 4:
+            lines += ['computer.relative = rb',
+                      'try:',
+                      '    computer.output_handle(p1)',
+                      'except Suspend:',
+                      f'    computer.cursor = {following}',
+                      '    raise']
+        elif opcode == 5:
+            lines += self.exit(f'p2 if p1 != 0 else {following}')
+        elif opcode == 6:
+            lines += self.exit(f'p2 if p1 == 0 else {following}')
+        elif opcode == 7:
+            lines += self.store(modes[2], cursor + 3, '1 if p1 < p2 else 0', following)
+        elif opcode == 8:
+            lines += self.store(modes[2], cursor + 3, '1 if p1 == p2 else 0', following)
+        elif opcode == 9:
+            lines += ['rb += p1']
+
+        self.lines += ['try:'] + [f'    {line}' for line in lines] + \
+            ['except Exception:', f'    computer.steps += {self.count}', '    raise']
+        self.cursor = following
+        self.terminated = opcode in (5, 6)
+        return not self.terminated
+
+    def generate(self) -> bool:
+        while self.cursor - self.start < self.max_length and self.instruction():
+            pass
+        if self.cursor == self.start:
+            return False
+        if not self.terminated:
+            self.lines += self.exit(str(self.cursor))
+        return True
+
+    def build(self) -> 'Block':
+        if not self.generate():
+            return None
+        source = '\n'.join(['def block(computer, memory, compiled):'] +
+                           [f'    {line}' for line in self.lines])
+        namespace = {'spill': spill, 'Suspend': Suspend}
+        exec(compile(source, f'<intcode block {self.start}>', 'exec'), namespace)
+        return Block(namespace['block'], self.guarded, [self.memory[p] for p in self.guarded],
+                     self.opcodes, self.required)
+
+
+class Block:
+
+    def __init__(self, function, guarded: [int], words: [int], opcodes: {int}, required: int):
+        self.function = function
+        self.guarded = guarded
+        self.cells = dict.fromkeys(guarded)
+        self.words = words
+        self.opcodes = opcodes
+        self.required = max([required, *(position + 1 for position in guarded)])
+
+    def matches(self, memory) -> bool:
+        return self.required <= len(memory) and \
+               [memory[position] for position in self.guarded] == self.words
+
+
+class Jit:
+
+    def __init__(self):
+        self.blocks: {int: 'function'} = {}
+        self.counts: {int: int} = {}
+        self.guard: {int: None} = {}
+        self.installed: {int: Block} = {}
+
+    def cached(self, memory, cursor: int):
+        for block in BLOCK_CACHE.get(cursor, ()):
+            if block.matches(memory):
+                return self.install(cursor, block)
+        return None
+
+    def lookup(self, memory, cursor: int):
+        count = self.counts.get(cursor, 0) + 1
+        self.counts[cursor] = count
+        if count == 1:
+            function = self.cached(memory, cursor)
+            if function is not None:
+                return function
+        heat = HEAT[cursor] = HEAT.get(cursor, 0) + 1
+        if heat < THRESHOLD and count < THRESHOLD:
+            return None
+
+        function = self.cached(memory, cursor)
+        if function is not None:
+            return function
+        block = BlockBuilder(memory, cursor, PATCHED).build()
+        if block is None:
+            self.blocks[cursor] = False
+            return False
+        loop = counting_loop(memory, cursor)
+        if loop is not None and not PATCHED.intersection(range(cursor, loop.end)):
+            block.function = accelerate(loop, block.function)
+        variants = BLOCK_CACHE.setdefault(cursor, [])
+        if len(variants) < MAX_VARIANTS:
+            variants.append(block)
+        return self.install(cursor, block)
+
+    def fork(self) -> 'Jit':
+        jit = Jit()
+        jit.blocks.update(self.blocks)
+        jit.counts.update(self.counts)
+        jit.guard.update(self.guard)
+        jit.installed.update(self.installed)
+        return jit
+
+    def rebase(self, image: [int]) -> 'Jit':
+        jit = Jit()
+        for start, block in self.installed.items():
+            if block.matches(image):
+                jit.install(start, block)
+        return jit
+
+    def install(self, start: int, block: Block):
+        self.blocks[start] = block.function
+        self.installed[start] = block
+        self.guard.update(block.cells)
+        return block.function
+
+    def invalidate(self, position: int):
+        for start, block in list(self.installed.items()):
+            if position in block.cells:
+                del self.blocks[start]
+                del self.installed[start]
+                self.counts.pop(start, None)
+                if position not in block.opcodes:
+                    PATCHED.add(position)
+                    BLOCK_CACHE[start] = [variant for variant in BLOCK_CACHE.get(start, ())
+                                          if position not in variant.cells]
+        self.guard.clear()
+        for block in self.installed.values():
+            self.guard.update(block.cells)
+
+
+LOOP = compile_loop('jit', arguments=['jit'], guarded=True,
+                    setup=['blocks = jit.blocks', 'metered = computer.limits is not None'], before=[
+    'block = blocks.get(cursor)',
+    'if block is None:',
+    '    block = jit.lookup(memory, cursor)',
+    f'if block and steps + {MAX_BLOCK_LENGTH} <= budget:',
+    '    if metered:',
+    '        computer.steps += steps',
+    '        steps = 0',
+    '    cursor = block(computer, memory, jit)',
+    '    if cursor < 0:',
+    '        memory = computer._instructions',
+    '        size = len(memory)',
+    '        cursor = computer.cursor',
+    '    budget = computer.meter - computer.steps',
+    '    continue'])
+
+
+def execute(computer: Computer, wait_input=False):
+    if not isinstance(computer.compiled, Jit):
+        computer.compiled = Jit()
+    return LOOP(computer, wait_input, computer.compiled)
@@ -0,0 +1,48 @@
+import sys
+import time
+from collections import namedtuple
+
+from intcode.errors import IntcodeError
+
+UNMETERED = sys.maxsize
+CLOCK_INTERVAL = 10_000
+
+Usage = namedtuple('Usage', ['steps', 'cells', 'peak', 'seconds'])
+
+
+class LimitExceeded(IntcodeError):
+    pass
+
+
+class StepLimitExceeded(LimitExceeded):
+    pass
+
+
+class MemoryLimitExceeded(LimitExceeded):
+    pass
+
+
+class TimeLimitExceeded(LimitExceeded):
+    pass
+
+
+class Limits:
+
+    def __init__(self, steps: int = None, cells: int = None, seconds: float = None):
+        self.steps = steps
+        self.cells = cells
+        self.seconds = seconds
+        self.started = time.monotonic()
+        self.deadline = self.started + seconds if seconds is not None else None
+
+    def meter(self, steps: int) -> int:
+        if self.steps is not None and steps >= self.steps:
+            raise StepLimitExceeded(f'executed {steps} of {self.steps} allowed steps')
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise TimeLimitExceeded(f'ran for more than {self.seconds}s')
+        meter = steps + CLOCK_INTERVAL if self.deadline is not None else UNMETERED
+        return meter if self.steps is None else min(meter, self.steps)
+
+    def reserve(self, cells: int):
+        if self.cells is not None and cells > self.cells:
+            raise MemoryLimitExceeded(f'needs {cells} of {self.cells} allowed memory cells')
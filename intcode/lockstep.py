@@ -0,0 +1,155 @@
+import numpy as np
+
+from intcode.computer import Event
+from intcode.errors import IntcodeError
+from intcode.memory import PAGE_SIZE
+
+WORD = np.int64
+LIMIT = float(2 ** 62)
+
+
+class Lockstep:
+
+    def __init__(self, program: [int], lanes: int):
+        self.memory = np.tile(np.array(program, dtype=WORD), (lanes, 1))
+        self.cursor = np.zeros(lanes, dtype=WORD)
+        self.relative = np.zeros(lanes, dtype=WORD)
+        self.active = np.ones(lanes, dtype=bool)
+        self.events = [Event.HALT] * lanes
+        self.errors: [IntcodeError] = [None] * lanes
+        self.inputs = np.zeros((lanes, 1), dtype=WORD)
+        self.available = np.zeros(lanes, dtype=WORD)
+        self.consumed = np.zeros(lanes, dtype=WORD)
+        self.outputs: [[int]] = [[] for _ in range(lanes)]
+
+    def load(self, jobs):
+        width = max([1, *(len(job.inputs) for job in jobs)])
+        self.inputs = np.zeros((len(jobs), width), dtype=WORD)
+        for lane, job in enumerate(jobs):
+            self.inputs[lane, :len(job.inputs)] = job.inputs
+            self.available[lane] = len(job.inputs)
+            if job.patches:
+                self.reserve(max(job.patches) + 1)
+                for position, value in job.patches.items():
+                    self.memory[lane, position] = value
+
+    def value(self, lane: int, position: int) -> int:
+        return int(self.memory[lane, position]) if position < self.memory.shape[1] else 0
+
+    def reserve(self, size: int):
+        width = self.memory.shape[1]
+        if size > width:
+            grown = np.zeros((self.memory.shape[0], -(-size // PAGE_SIZE) * PAGE_SIZE), dtype=WORD)
+            grown[:, :width] = self.memory
+            self.memory = grown
+
+    def address(self, lanes, position: int, mode: int):
+        address = self.memory[lanes, position]
+        if mode == 2:
+            address = address + self.relative[lanes]
+        if address.min() < 0:
+            raise IntcodeError(f'tried to access invalid slot: {address.min()}')
+        self.reserve(int(address.max()) + 1)
+        return address
+
+    def read(self, lanes, position: int, mode: int):
+        if mode == 1:
+            return self.memory[lanes, position]
+        address = self.address(lanes, position, mode)
+        return self.memory[lanes, address]
+
+    def write(self, lanes, position: int, mode: int, values):
+        address = self.address(lanes, position, mode)
+        self.memory[lanes, address] = values
+
+    def stop(self, lanes, event: Event):
+        self.active[lanes] = False
+        for lane in lanes.tolist():
+            self.events[lane] = event
+
+    def fail(self, lane: int, error: IntcodeError):
+        self.active[lane] = False
+        self.events[lane] = None
+        self.errors[lane] = error
+
+    def step(self, lanes, cursor: int, instruction: int):
+        opcode = instruction % 100
+        modes = (instruction // 100 % 10, instruction // 1000 % 10, instruction // 10000 % 10)
+        self.reserve(cursor + 4)
+
+        if opcode in (1, 2, 7, 8):
+            a = self.read(lanes, cursor + 1, modes[0])
+            b = self.read(lanes, cursor + 2, modes[1])
+            if opcode in (1, 2):
+                estimate = a.astype(float) + b if opcode == 1 else a.astype(float) * b
+                if np.abs(estimate).max() >= LIMIT:
+                    raise OverflowError(f'lockstep lanes left int64 at {cursor}')
+            result = a + b if opcode == 1 else a * b if opcode == 2 else \
+                (a < b).astype(WORD) if opcode == 7 else (a == b).astype(WORD)
+            self.write(lanes, cursor + 3, modes[2], result)
+            self.cursor[lanes] = cursor + 4
+        elif opcode == 3:
+            starved = self.consumed[lanes] >= self.available[lanes]
+            self.stop(lanes[starved], Event.INPUT)
+            lanes = lanes[~starved]
+            if not len(lanes):
+                return
+            self.write(lanes, cursor + 1, modes[0], self.inputs[lanes, self.consumed[lanes]])
+            self.consumed[lanes] += 1
+            self.cursor[lanes] = cursor + 2
+        elif opcode == 4:
+            for lane, value in zip(lanes.tolist(), self.read(lanes, cursor + 1, modes[0]).tolist()):
+                self.outputs[lane].append(value)
+            self.cursor[lanes] = cursor + 2
+        elif opcode in (5, 6):
+            condition = self.read(lanes, cursor + 1, modes[0]) != 0
+            target = self.read(lanes, cursor + 2, modes[1])
+            taken = condition if opcode == 5 else ~condition
+            self.cursor[lanes] = np.where(taken, target, cursor + 3)
+        elif opcode == 9:
+            self.relative[lanes] += self.read(lanes, cursor + 1, modes[0])
+            self.cursor[lanes] = cursor + 2
+        elif opcode == 99:
+            self.stop(lanes, Event.HALT)
+        else:
+            raise IntcodeError(f'could not read: {cursor} {instruction}')
+
+    def run(self):
+        while self.active.any():
+            lanes = np.flatnonzero(self.active)
+            cursors = self.cursor[lanes]
+            ended = cursors >= self.memory.shape[1]
+            if ended.any():
+                self.stop(lanes[ended], Event.HALT)
+                lanes, cursors = lanes[~ended], cursors[~ended]
+                if not len(lanes):
+                    continue
+            instructions = self.memory[lanes, cursors]
+            order = np.lexsort((instructions, cursors))
+            lanes, cursors, instructions = lanes[order], cursors[order], instructions[order]
+            starts = np.flatnonzero(np.diff(cursors) | np.diff(instructions)) + 1
+            for group, start in zip(np.split(lanes, starts), [0, *starts.tolist()]):
+                cursor, instruction = int(cursors[start]), int(instructions[start])
+                try:
+                    self.step(group, cursor, instruction)
+                except IntcodeError:
+                    for lane in np.split(group, len(group)):
+                        try:
+                            self.step(lane, cursor, instruction)
+                        except IntcodeError as error:
+                            self.fail(int(lane[0]), error)
+
+
+def run_lockstep(program: [int], jobs, lanes: int = 4096) -> [(Event, [int], [int], IntcodeError)]:
+    jobs = list(jobs)
+    results = []
+    for start in range(0, len(jobs), lanes):
+        chunk = jobs[start:start + lanes]
+        machine = Lockstep(program, len(chunk))
+        machine.load(chunk)
+        machine.run()
+        for lane, job in enumerate(chunk):
+            error = machine.errors[lane]
+            values = [] if error else [machine.value(lane, position) for position in job.reads]
+            results.append((machine.events[lane], machine.outputs[lane], values, error))
+    return results
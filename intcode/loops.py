@@ -0,0 +1,166 @@
+from intcode.computer import Computer, decode
+from intcode.dispatch import RELOAD
+
+MAX_LOOP_LENGTH = 16
+
+IMMEDIATE = 1
+POSITION = 0
+RELATIVE = 2
+PREDICATES = {(7, 5): '<0', (7, 6): '>=0', (8, 5): '==0', (8, 6): '!=0'}
+
+
+def reference(mode: int, parameter: int) -> (int, int):
+    return (mode if mode in (IMMEDIATE, RELATIVE) else POSITION), parameter
+
+
+def target_reference(mode: int, parameter: int) -> (int, int):
+    return (RELATIVE if mode == RELATIVE else POSITION), parameter
+
+
+def iterations(predicate: str, start: int, step: int):
+    if predicate == '<0':
+        return 0 if start >= 0 else None if step <= 0 else -(start // step)
+    elif predicate == '>=0':
+        return 0 if start < 0 else None if step >= 0 else start // -step + 1
+    elif predicate == '==0':
+        return 0 if start != 0 else None if step == 0 else 1
+    if start == 0:
+        return 0
+    if step == 0 or -start % step != 0 or -start // step <= 0:
+        return None
+    return -start // step
+
+
+class CountingLoop:
+
+    def __init__(self, header: int, end: int, length: int, updates: [((int, int), (int, int), int)],
+                 compares: [((int, int), int, (int, int), (int, int), int)],
+                 condition: (int, (int, int))):
+        self.header = header
+        self.end = end
+        self.length = length
+        self.updates = updates
+        self.compares = compares
+        self.condition = condition
+
+    def advance(self, computer: Computer) -> int:
+        relative = computer.relative
+        read = computer.read_value
+
+        def address(ref: (int, int)) -> int:
+            return ref[1] + relative if ref[0] == RELATIVE else ref[1]
+
+        variables = {}
+        for target, step, index in self.updates:
+            variables[address(target)] = (step, index)
+        compared = {address(target): index for target, _, _, _, index in self.compares}
+        written = set(variables) | set(compared)
+        if len(written) != len(self.updates) + len(self.compares) or \
+                any(position < 0 or self.header <= position < self.end for position in written):
+            return None
+
+        def value(ref: (int, int), index: int) -> (int, int):
+            if ref[0] == IMMEDIATE:
+                return ref[1], 0
+            position = address(ref)
+            if position < 0 or position in compared:
+                raise ValueError(position)
+            if position not in variables:
+                return read(position), 0
+            step, updated = variables[position]
+            increment = constant(step)
+            return read(position) + (increment if updated < index else 0), increment
+
+        def constant(ref: (int, int)) -> int:
+            if ref[0] == IMMEDIATE:
+                return ref[1]
+            position = address(ref)
+            if position < 0 or position in written:
+                raise ValueError(position)
+            return read(position)
+
+        try:
+            jump, condition = self.condition
+            if condition[0] != IMMEDIATE and address(condition) in compared:
+                target, opcode, left, right, index = next(
+                    compare for compare in self.compares
+                    if address(compare[0]) == address(condition))
+                left_start, left_step = value(left, index)
+                right_start, right_step = value(right, index)
+                start, step = left_start - right_start, left_step - right_step
+                predicate = PREDICATES[opcode, jump]
+            else:
+                start, step = value(condition, self.length)
+                predicate = '!=0' if jump == 5 else '==0'
+
+            count = iterations(predicate, start, step)
+            if count is None or computer.steps + (count + 1) * self.length > computer.meter:
+                return None
+
+            results = []
+            for target, step, index in self.updates:
+                position = address(target)
+                results.append((position, read(position) + (count + 1) * constant(step)))
+            for target, opcode, left, right, index in self.compares:
+                left_start, left_step = value(left, index)
+                right_start, right_step = value(right, index)
+                difference = left_start - right_start + count * (left_step - right_step)
+                outcome = difference < 0 if opcode == 7 else difference == 0
+                results.append((address(target), 1 if outcome else 0))
+        except ValueError:
+            return None
+
+        for position, result in results:
+            computer.update_value(position, result)
+        computer.steps += (count + 1) * self.length
+        return self.end
+
+
+def counting_loop(memory, header: int) -> CountingLoop:
+    cursor = header
+    updates = []
+    compares = []
+    while cursor < len(memory) and cursor - header < MAX_LOOP_LENGTH:
+        opcode, modes, length = decode(memory[cursor])
+        if cursor + length > len(memory) or max(modes) > 2:
+            return None
+        parameters = memory[cursor + 1:cursor + length]
+        index = len(updates) + len(compares)
+        if opcode == 1:
+            target = target_reference(modes[2], parameters[2])
+            first = reference(modes[0], parameters[0])
+            second = reference(modes[1], parameters[1])
+            if first == target:
+                updates.append((target, second, index))
+            elif second == target:
+                updates.append((target, first, index))
+            else:
+                return None
+        elif opcode in (7, 8):
+            compares.append((target_reference(modes[2], parameters[2]), opcode,
+                             reference(modes[0], parameters[0]),
+                             reference(modes[1], parameters[1]), index))
+        elif opcode in (5, 6) and modes[1] == IMMEDIATE and parameters[1] == header:
+            condition = reference(modes[0], parameters[0])
+            if condition[0] == IMMEDIATE or not updates:
+                return None
+            return CountingLoop(header, cursor + length, index + 1, updates, compares,
+                                (opcode, condition))
+        else:
+            return None
+        cursor += length
+    return None
+
+
+def accelerate(loop: CountingLoop, body):
+    def accelerated(computer, memory, compiled):
+        following = loop.advance(computer)
+        if following is None:
+            return body(computer, memory, compiled)
+        if memory is not computer._instructions:
+            computer.cursor = following
+            return RELOAD
+        return following
+
+    return accelerated
+
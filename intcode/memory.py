@@ -0,0 +1,166 @@
+from array import array
+
+PAGE_BITS = 10
+PAGE_SIZE = 1 << PAGE_BITS
+PAGE_MASK = PAGE_SIZE - 1
+DENSE_BITS = 6
+DENSE_SIZE = 1 << DENSE_BITS
+DENSE_MASK = DENSE_SIZE - 1
+WORD = 'q'
+
+
+def zobrist(position: int, value: int) -> int:
+    return hash((position, value)) if value else 0
+
+
+def digest(values: [int], start: int = 0) -> int:
+    result = 0
+    for position, value in enumerate(values, start):
+        if value:
+            result ^= hash((position, value))
+    return result
+
+
+class PagedMemory:
+
+    def __init__(self, pages: {int: [int]} = None):
+        self.pages: {int: [int]} = pages if pages is not None else {}
+        self.owned: {int} = set()
+        self.digest = 0
+
+    def read(self, position: int) -> int:
+        page = self.pages.get(position >> PAGE_BITS)
+        return page[position & PAGE_MASK] if page is not None else 0
+
+    def write(self, position: int, value: int):
+        index = position >> PAGE_BITS
+        page = self.pages.get(index)
+        if index not in self.owned:
+            page = self.pages[index] = [0] * PAGE_SIZE if page is None else page.copy()
+            self.owned.add(index)
+        self.digest ^= zobrist(position, page[position & PAGE_MASK]) ^ zobrist(position, value)
+        page[position & PAGE_MASK] = value
+
+    def take(self, start: int, stop: int) -> [int]:
+        if not self.pages:
+            return [0] * (stop - start)
+        return [self.read(position) for position in range(start, stop)]
+
+    def release(self, start: int, stop: int):
+        if not self.pages:
+            return
+        for position in range(start, stop):
+            if self.read(position):
+                self.write(position, 0)
+        for index in [index for index in self.pages if (index + 1) << PAGE_BITS <= stop]:
+            del self.pages[index]
+
+    def copy(self) -> 'PagedMemory':
+        memory = PagedMemory({index: page.copy() for index, page in self.pages.items()})
+        memory.owned.update(memory.pages)
+        memory.digest = self.digest
+        return memory
+
+    def fork(self) -> 'PagedMemory':
+        self.owned.clear()
+        memory = PagedMemory(self.pages.copy())
+        memory.digest = self.digest
+        return memory
+
+    def __len__(self):
+        return len(self.pages) << PAGE_BITS
+
+
+class Overlay:
+
+    def __init__(self, base, pages: {int: [int]} = None, sharers: [int] = None):
+        self.base = base
+        self.pages: {int: [int]} = pages if pages is not None else {}
+        self.owned: {int} = set()
+        self.sharers = sharers if sharers is not None else [1]
+
+    def __getitem__(self, position: int) -> int:
+        page = self.pages.get(position >> DENSE_BITS)
+        return page[position & DENSE_MASK] if page is not None else self.base[position]
+
+    def write(self, position: int, value: int):
+        index = position >> DENSE_BITS
+        page = self.pages.get(index)
+        if index not in self.owned:
+            start = index << DENSE_BITS
+            page = self.pages[index] = \
+                list(self.base[start:start + DENSE_SIZE]) if page is None else page.copy()
+            self.owned.add(index)
+        page[position & DENSE_MASK] = value
+
+    def fork(self) -> 'Overlay':
+        self.owned.clear()
+        self.sharers[0] += 1
+        return Overlay(self.base, self.pages.copy(), self.sharers)
+
+    def release(self):
+        self.sharers[0] -= 1
+
+    def flatten(self, own: bool = False):
+        if own:
+            self.release()
+        memory = self.base if own and self.sharers[0] == 0 else self.base.copy()
+        for index, page in self.pages.items():
+            for position, value in enumerate(page, index << DENSE_BITS):
+                if memory[position] != value:
+                    try:
+                        memory[position] = value
+                    except OverflowError:
+                        memory = memory.tolist()
+                        memory[position] = value
+        return memory
+
+
+class ArrayMemory(array):
+
+    def __new__(cls, values: [int] = ()):
+        return super().__new__(cls, WORD, values)
+
+    def extend(self, values: [int]):
+        super().extend(ArrayMemory(values))
+
+    def copy(self) -> 'ArrayMemory':
+        return ArrayMemory(self)
+
+
+def compact(values: [int]):
+    try:
+        return ArrayMemory(values)
+    except OverflowError:
+        return list(values)
+
+
+def like(memory, values: [int]):
+    return compact(values) if isinstance(memory, ArrayMemory) else type(memory)(values)
+
+
+class HashedMemory(list):
+
+    def __init__(self, values: [int] = ()):
+        super().__init__(values)
+        self.digest = digest(self)
+
+    def __setitem__(self, position: int, value: int):
+        if isinstance(position, slice):
+            list.__setitem__(self, position, value)
+            self.digest = digest(self)
+            return
+        previous = list.__getitem__(self, position)
+        self.digest ^= zobrist(position, previous) ^ zobrist(position, value)
+        list.__setitem__(self, position, value)
+
+    def extend(self, values: [int]):
+        start = len(self)
+        super().extend(values)
+        self.digest ^= digest(self[start:], start)
+
+    def copy(self) -> 'HashedMemory':
+        memory = HashedMemory()
+        list.extend(memory, self)
+        memory.digest = self.digest
+        return memory
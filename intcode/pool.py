@@ -0,0 +1,33 @@
+from contextlib import contextmanager
+
+from intcode.computer import Computer
+from intcode.snapshot import Snapshot, boot
+
+
+class ComputerPool:
+
+    def __init__(self, program: [int], size: int = 0, engine: str = None, warm=False, packed=False):
+        self.image: Snapshot = boot(program, engine, packed) if warm else \
+            Snapshot(Computer(program.copy(), None, None, engine=engine, packed=packed))
+        self.idle: [Computer] = [self.allocate() for _ in range(size)]
+
+    def allocate(self) -> Computer:
+        return self.image.spawn()
+
+    def acquire(self, input_handle=None, output_handle=None) -> Computer:
+        computer = self.idle.pop() if self.idle else self.allocate()
+        computer.input_handle = input_handle
+        computer.output_handle = output_handle
+        return computer
+
+    def release(self, computer: Computer):
+        self.image.restore(computer)
+        self.idle.append(computer)
+
+    @contextmanager
+    def computer(self, input_handle=None, output_handle=None) -> Computer:
+        computer = self.acquire(input_handle, output_handle)
+        try:
+            yield computer
+        finally:
+            self.release(computer)
@@ -0,0 +1,144 @@
+import json
+import runpy
+import sys
+import time
+from collections import Counter
+from importlib import import_module
+
+from intcode.computer import OPCODE_NAMES, WAIT, Computer
+from intcode.dispatch import compile_loop
+
+PROFILES: ['Profile'] = None
+
+
+class Profile:
+
+    def __init__(self):
+        self.opcodes: Counter = Counter()
+        self.addresses: Counter = Counter()
+        self.calls = {'input': 0, 'output': 0}
+        self.blocked = {'input': 0.0, 'output': 0.0}
+        self.growth: [(int, int)] = []
+        self.queued = 0
+        self.waiting = 0.0
+        self.waited: float = None
+        self.steps = 0
+        self.seconds = 0.0
+
+    def timed(self, kind: str, handle):
+        def handler(*arguments):
+            started = time.monotonic()
+            try:
+                return handle(*arguments)
+            finally:
+                self.calls[kind] += 1
+                self.blocked[kind] += time.monotonic() - started
+        return handler
+
+    def merge(self, other: 'Profile'):
+        self.opcodes.update(other.opcodes)
+        self.addresses.update(other.addresses)
+        for kind in self.calls:
+            self.calls[kind] += other.calls[kind]
+            self.blocked[kind] += other.blocked[kind]
+        self.growth += other.growth
+        self.queued += other.queued
+        self.waiting += other.waiting
+        self.steps += other.steps
+        self.seconds += other.seconds
+
+    def as_dict(self, top: int = None) -> dict:
+        return {'steps': self.steps,
+                'seconds': self.seconds,
+                'interpreter_seconds': self.seconds - sum(self.blocked.values()),
+                'handlers': {kind: {'calls': self.calls[kind], 'seconds': self.blocked[kind]}
+                             for kind in self.calls},
+                'queue': {'inputs': self.queued, 'waiting_seconds': self.waiting},
+                'opcodes': {OPCODE_NAMES.get(opcode, str(opcode)): count
+                            for opcode, count in self.opcodes.most_common()},
+                'addresses': {str(address): count
+                              for address, count in self.addresses.most_common(top)},
+                'growth': self.growth}
+
+    def json(self, top: int = None) -> str:
+        return json.dumps(self.as_dict(top), indent=2)
+
+    def report(self, top: int = 20) -> str:
+        total = self.steps or 1
+        lines = [f'{self.steps} steps in {self.seconds:.3f}s, '
+                 f'interpreter {self.seconds - sum(self.blocked.values()):.3f}s']
+        lines += [f'{kind} handler: {self.calls[kind]} calls, {self.blocked[kind]:.3f}s'
+                  for kind in self.calls]
+        lines += [f'input queue: {self.queued} inputs, {self.waiting:.3f}s waiting between runs']
+        lines += ['', 'opcode        count   share']
+        lines += [f'{OPCODE_NAMES.get(opcode, opcode):<6} {count:>12} {count / total:>7.1%}'
+                  for opcode, count in self.opcodes.most_common()]
+        lines += ['', 'address       count   share']
+        lines += [f'{address:<6} {count:>12} {count / total:>7.1%}'
+                  for address, count in self.addresses.most_common(top)]
+        if self.growth:
+            lines += ['', f'memory grew {len(self.growth)} times, '
+                          f'to {max(cells for _, cells in self.growth)} cells']
+        return '\n'.join(lines)
+
+
+LOOP = compile_loop('profile', arguments=['profile'],
+                    setup=['opcodes = profile.opcodes', 'addresses = profile.addresses'],
+                    before=['computer.cursor = cursor',
+                            'addresses[cursor] += 1',
+                            'opcodes[memory[cursor] % 100] += 1'],
+                    after=[f'if following == {WAIT}:',
+                           '    addresses[cursor] -= 1',
+                           '    opcodes[3] -= 1'])
+
+
+def execute(computer: Computer, wait_input=False):
+    if computer.profile is None:
+        computer.profile = Profile()
+        if PROFILES is not None:
+            PROFILES.append(computer.profile)
+    profile = computer.profile
+    input_handle = computer.input_handle
+    output_handle = computer.output_handle
+    computer.input_handle = profile.timed('input', input_handle)
+    computer.output_handle = profile.timed('output', output_handle)
+    steps = computer.steps
+    queued = profile.opcodes[3]
+    started = time.monotonic()
+    if profile.waited is not None:
+        profile.waiting += started - profile.waited
+        profile.waited = None
+    try:
+        status = LOOP(computer, wait_input, profile)
+    finally:
+        if wait_input:
+            profile.queued += profile.opcodes[3] - queued
+        profile.steps += computer.steps - steps
+        profile.seconds += time.monotonic() - started
+        computer.input_handle = input_handle
+        computer.output_handle = output_handle
+    if status == WAIT:
+        profile.waited = time.monotonic()
+    return status
+
+
+def main():
+    if len(sys.argv) < 2:
+        print('usage: python -m intcode.profiler <module> [report.json]')
+        sys.exit()
+    Computer.default_engine = 'profile'
+    profiles = import_module('intcode.profiler').PROFILES = []
+    try:
+        runpy.run_module(sys.argv[1], run_name='__main__')
+    finally:
+        total = Profile()
+        for profile in profiles:
+            total.merge(profile)
+        print(total.report(), file=sys.stderr)
+        if len(sys.argv) > 2:
+            with open(sys.argv[2], 'w') as file:
+                file.write(total.json())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+import heapq
+from collections import deque
+from itertools import count
+
+from intcode.computer import Computer, Event, Suspend
+from intcode.limits import UNMETERED, Limits
+
+
+class TimeSlice:
+
+    def __init__(self, limits: Limits, end: int):
+        self.limits = limits
+        self.end = end
+
+    def meter(self, steps: int) -> int:
+        if steps >= self.end:
+            raise Suspend()
+        return min(self.limits.meter(steps) if self.limits is not None else UNMETERED, self.end)
+
+    def reserve(self, cells: int):
+        if self.limits is not None:
+            self.limits.reserve(cells)
+
+
+class Task:
+
+    def __init__(self, computer: Computer, route=None, priority: int = 0, idle: int = None):
+        self.computer = computer
+        self.route = route
+        self.priority = priority
+        self.idle = idle
+        self.polled = False
+        self.queued = False
+        self.blocked = False
+        self.halted = False
+
+
+class Scheduler:
+
+    def __init__(self, policy: str = 'round-robin', time_slice: int = None, on_idle=None):
+        if policy not in ('round-robin', 'priority'):
+            raise ValueError(f'unknown scheduling policy: {policy}')
+        if time_slice is not None and time_slice < 1:
+            raise ValueError(f'time slice must be at least one step: {time_slice}')
+        self.policy = policy
+        self.time_slice = time_slice
+        self.on_idle = on_idle
+        self.tasks: [Task] = []
+        self.ready: deque = deque()
+        self.heap: [(int, int, Task)] = []
+        self.order = count()
+        self.stopped = False
+
+    def add(self, computer: Computer, route=None, priority: int = 0, idle: int = None) -> Task:
+        task = Task(computer, route, priority, idle)
+        self.tasks.append(task)
+        self.wake(task)
+        return task
+
+    def connect(self, source: Task, target: Task):
+        source.route = lambda value: self.send(target, value)
+
+    def send(self, task: Task, *values: int):
+        task.computer.inputs.extend(values)
+        task.polled = False
+        if task.blocked:
+            task.blocked = False
+            self.wake(task)
+
+    def wake(self, task: Task):
+        if task.queued or task.halted:
+            return
+        task.queued = True
+        if self.policy == 'priority':
+            heapq.heappush(self.heap, (-task.priority, next(self.order), task))
+        else:
+            self.ready.append(task)
+
+    def next(self) -> Task:
+        if self.policy == 'priority':
+            return heapq.heappop(self.heap)[2] if self.heap else None
+        return self.ready.popleft() if self.ready else None
+
+    def stop(self):
+        self.stopped = True
+
+    def run(self):
+        self.stopped = False
+        while not self.stopped:
+            task = self.next()
+            if task is None:
+                if self.on_idle is not None:
+                    self.on_idle()
+                    task = self.next()
+                if task is None:
+                    return
+            task.queued = False
+            self.turn(task)
+
+    def turn(self, task: Task):
+        computer = task.computer
+        if self.time_slice is None:
+            event = computer.run_until()
+        else:
+            limits = computer.limits
+            computer.limits = TimeSlice(limits, computer.steps + self.time_slice)
+            computer.meter = 0
+            try:
+                event = computer.run_until()
+            finally:
+                computer.limits = limits
+                computer.meter = 0
+
+        if computer.outputs and task.route is not None:
+            task.polled = False
+            while computer.outputs:
+                task.route(computer.outputs.popleft())
+
+        if event == Event.HALT:
+            task.halted = True
+        elif event == Event.INPUT and not computer.inputs:
+            if task.idle is not None and not task.polled:
+                task.polled = True
+                computer.inputs.append(task.idle)
+                self.wake(task)
+            else:
+                task.blocked = True
+        else:
+            self.wake(task)
@@ -0,0 +1,40 @@
+from intcode.computer import Computer, Event
+from intcode.memory import like
+
+
+class Snapshot:
+
+    def __init__(self, computer: Computer):
+        self.memory = like(computer._instructions, computer.memory())
+        self.pages = computer.pages.copy()
+        self.relative = computer.relative
+        self.cursor = computer.cursor
+        self.steps = computer.steps
+        self.outputs: (int,) = tuple(computer.outputs)
+        self.decoded: {int: (int, (int, int, int), int)} = computer._decoded.copy()
+        self.engine = computer.engine
+
+    def restore(self, computer: Computer):
+        computer.reset(self.memory)
+        computer.pages = self.pages.fork()
+        computer.relative = self.relative
+        computer.cursor = self.cursor
+        computer.steps = self.steps
+        computer.outputs.extend(self.outputs)
+        computer._decoded.update(self.decoded)
+
+    def spawn(self, input_handle=None, output_handle=None) -> Computer:
+        computer = Computer(self.memory.copy(), input_handle, output_handle, relative=self.relative,
+                            cursor=self.cursor, engine=self.engine)
+        computer.pages = self.pages.fork()
+        computer.steps = self.steps
+        computer.outputs.extend(self.outputs)
+        computer._decoded.update(self.decoded)
+        computer.image = self.memory
+        return computer
+
+
+def boot(program: [int], engine: str = None, packed=False) -> Snapshot:
+    computer = Computer(program.copy(), None, None, engine=engine, packed=packed)
+    computer.run_until(Event.INPUT | Event.HALT)
+    return Snapshot(computer)
@@ -0,0 +1,105 @@
+import sys
+from array import array
+
+from intcode.computer import OPCODE_NAMES, WAIT, Computer, decode
+from intcode.dispatch import compile_loop
+
+TRACE_SIZE = 1024
+WRITE_OFFSETS = {1: 3, 2: 3, 3: 1, 7: 3, 8: 3}
+
+
+class Tracer:
+
+    def __init__(self, size: int = TRACE_SIZE):
+        self.size = 1 << (size - 1).bit_length()
+        self.mask = self.size - 1
+        self.cursors = array('q', bytes(8 * self.size))
+        self.relatives = array('q', bytes(8 * self.size))
+        self.instructions: [int] = [0] * self.size
+        self.operands: ([int], [int], [int]) = ([0] * self.size, [0] * self.size, [0] * self.size)
+        self.targets: [int] = [0] * self.size
+        self.values: [int] = [0] * self.size
+        self.written = bytearray(self.size)
+        self.count = 0
+        self.breakpoints: {int} = set()
+
+    def clear(self):
+        self.count = 0
+
+    def entry(self, step: int) -> (int, int, int, int, (int,), (int, int)):
+        index = step & self.mask
+        return (step, self.cursors[index], self.relatives[index], self.instructions[index],
+                tuple(column[index] for column in self.operands),
+                (self.targets[index], self.values[index]) if self.written[index] else None)
+
+    def entries(self) -> [(int, int, int, int, (int,), (int, int))]:
+        return [self.entry(step) for step in range(max(0, self.count - self.size), self.count)]
+
+    def format(self, reason: str = None) -> str:
+        lines = [f'trace: last {min(self.count, self.size)} of {self.count} steps'
+                 + (f' ({reason})' if reason else '')]
+        for step, cursor, relative, instruction, operands, write in self.entries():
+            opcode, modes, length = decode(instruction)
+            name = OPCODE_NAMES.get(opcode, '???')
+            line = f'{step:>10} {cursor:>6} rb={relative:<6} {name:<4} ' \
+                   f'{instruction:>6} {" ".join(map(str, operands[:length - 1]))}'
+            if write is not None:
+                line += f'  [{write[0]}] = {write[1]}'
+            lines.append(line)
+        return '\n'.join(lines)
+
+    def dump(self, reason: str = None, file=None):
+        print(self.format(reason), file=file or sys.stderr)
+
+
+LOOP = compile_loop('trace', {'WRITE_OFFSETS': WRITE_OFFSETS}, arguments=['tracer'], setup=[
+    'mask = tracer.mask',
+    'cursors = tracer.cursors',
+    'relatives = tracer.relatives',
+    'instructions = tracer.instructions',
+    'first, second, third = tracer.operands',
+    'targets = tracer.targets',
+    'values = tracer.values',
+    'written = tracer.written',
+    'breakpoints = tracer.breakpoints'
+], before=[
+    'if cursor in breakpoints:',
+    "    tracer.dump(f'breakpoint at {cursor}')",
+    'instruction = memory[cursor]',
+    'index = tracer.count & mask',
+    'tracer.count += 1',
+    'cursors[index] = cursor',
+    'relatives[index] = computer.relative',
+    'instructions[index] = instruction',
+    'if cursor + 4 <= size:',
+    '    first[index] = memory[cursor + 1]',
+    '    second[index] = memory[cursor + 2]',
+    '    third[index] = memory[cursor + 3]',
+    'else:',
+    '    first[index] = computer.read_value(cursor + 1)',
+    '    second[index] = computer.read_value(cursor + 2)',
+    '    third[index] = computer.read_value(cursor + 3)',
+    'written[index] = 0',
+    'offset = WRITE_OFFSETS.get(instruction % 100)',
+    'if offset is not None:',
+    '    target = computer.read_value(cursor + offset)',
+    '    if instruction // (10 ** (offset + 1)) % 10 == 2:',
+    '        target += computer.relative',
+    'computer.cursor = cursor'
+], after=[
+    f'if following == {WAIT}:',
+    '    tracer.count -= 1',
+    'elif offset is not None:',
+    '    targets[index] = target',
+    '    values[index] = computer.read_value(target)',
+    '    written[index] = 1'])
+
+
+def execute(computer: Computer, wait_input=False):
+    if computer.tracer is None:
+        computer.tracer = Tracer()
+    try:
+        return LOOP(computer, wait_input, computer.tracer)
+    except Exception as error:
+        computer.tracer.dump(f'{type(error).__name__}: {error}')
+        raise
@@ -0,0 +1,191 @@
+import hashlib
+import importlib.util
+import os
+
+from intcode.cfg import analyse
+from intcode.computer import HALT, WAIT, Computer, decode
+from intcode.dispatch import RELOAD, compile_loop
+from intcode.jit import BlockBuilder
+
+VERSION = 5
+MAX_LOADED = 64
+CACHE_DIRECTORY = os.environ.get('INTCODE_CACHE',
+                                 os.path.join(os.path.expanduser('~'), '.cache', 'intcode'))
+
+EXIT = 1
+DEOPT = 2
+
+LOADED: {str: 'module'} = {}
+
+
+class SectionBuilder(BlockBuilder):
+    max_length = float('inf')
+
+    def __init__(self, memory, start: int, dynamic: {int}, labels: {int}):
+        super().__init__(memory, start, dynamic)
+        self.labels = labels
+
+    def prologue(self) -> [str]:
+        return []
+
+    def exit(self, following: str) -> [str]:
+        return [f'computer.steps += {self.count}', f'pc = {following}', 'continue']
+
+    def reload(self) -> [str]:
+        return [f'computer.steps += {self.count}', f'return {RELOAD}, computer.cursor, rb']
+
+    def deoptimize(self, following: int) -> [str]:
+        return ['translation.invalidate(t)', f'computer.steps += {self.count}',
+                f'return {DEOPT}, {following}, rb']
+
+    def instruction(self) -> bool:
+        memory = self.memory
+        cursor = self.cursor
+        if cursor >= len(memory) or cursor != self.start and cursor in self.labels:
+            return False
+        opcode, modes, length = decode(memory[cursor])
+        if opcode == 99:
+            self.opcodes.add(cursor)
+            self.guarded.append(cursor)
+            self.count += 1
+            self.lines += [f'computer.steps += {self.count}', f'return {HALT}, {cursor}, rb']
+        elif opcode == 3 and modes[0] in (0, 2) and cursor + length <= len(memory) and \
+                (modes[0] == 2 or cursor + 1 in self.dynamic or memory[cursor + 1] >= 0):
+            self.opcodes.add(cursor)
+            self.guarded.append(cursor)
+            self.count += 1
+            following = cursor + length
+            self.lines += ['if not wait_input:',
+                           '    computer.relative = rb',
+                           '    value = computer.input_handle()',
+                           'elif computer.inputs:',
+                           '    value = computer.inputs.popleft()',
+                           'else:',
+                           f'    computer.steps += {self.count - 1}',
+                           f'    return {WAIT}, {cursor}, rb']
+            self.lines += self.store(modes[0], cursor + 1, 'value', following)
+            self.lines += self.exit(str(following))
+        else:
+            return super().instruction()
+        self.cursor += length
+        self.terminated = True
+        return False
+
+
+def dispatch_tree(labels: [int], sections: {int: [str]}, depth: int) -> [str]:
+    indent = '    ' * depth
+    if len(labels) <= 4:
+        lines = []
+        for i, label in enumerate(labels):
+            lines.append(f'{indent}{"elif" if i else "if"} pc == {label}:')
+            lines += [f'{indent}    {line}' for line in sections[label]]
+        return lines
+    middle = len(labels) // 2
+    return [f'{indent}if pc < {labels[middle]}:'] + \
+        dispatch_tree(labels[:middle], sections, depth + 1) + \
+        [f'{indent}else:'] + \
+        dispatch_tree(labels[middle:], sections, depth + 1)
+
+
+def translate(memory: [int]) -> str:
+    _, labels, dynamic = analyse(memory)
+    sections: {int: [str]} = {}
+    guard = set()
+    for label in sorted(labels):
+        builder = SectionBuilder(memory, label, dynamic, labels)
+        if builder.generate():
+            sections[label] = builder.lines
+            guard.update(builder.guarded)
+
+    ordered = sorted(sections)
+    return '\n'.join([f'# Translated from Intcode program {fingerprint(memory)}',
+                      'from intcode.computer import Suspend',
+                      'from intcode.dispatch import spill',
+                      '',
+                      f'LABELS = frozenset({ordered})',
+                      f'GUARD = frozenset({sorted(guard)})',
+                      '',
+                      '',
+                      'def run(computer, memory, pc, rb, translation, wait_input):',
+                      '    guard = translation.guard',
+                      '    while True:'] +
+                     dispatch_tree(ordered, sections, 2) +
+                     [f'        return {EXIT}, pc, rb', ''])
+
+
+def fingerprint(memory: [int]) -> str:
+    return hashlib.sha256(f'{VERSION}:{",".join(map(str, memory))}'.encode()).hexdigest()[:32]
+
+
+def load(image: [int]):
+    key = fingerprint(image)
+    module = LOADED.get(key)
+    if module is None:
+        path = os.path.join(CACHE_DIRECTORY, f'intcode_{key}.py')
+        if not os.path.exists(path):
+            os.makedirs(CACHE_DIRECTORY, exist_ok=True)
+            temporary = f'{path}.{os.getpid()}.tmp'
+            with open(temporary, 'w') as file:
+                file.write(translate(image))
+            os.replace(temporary, path)
+        specification = importlib.util.spec_from_file_location(f'intcode_{key}', path)
+        module = importlib.util.module_from_spec(specification)
+        specification.loader.exec_module(module)
+        if len(LOADED) >= MAX_LOADED:
+            LOADED.clear()
+        LOADED[key] = module
+    return module
+
+
+class Translation:
+
+    def __init__(self, module, image: [int], valid=True):
+        self.module = module
+        self.image = image
+        self.run = module.run
+        self.labels = module.LABELS
+        self.guard = module.GUARD
+        self.valid = valid
+
+    def matches(self, memory: [int]) -> bool:
+        image = self.image
+        return len(memory) >= len(image) and \
+            all(memory[position] == image[position] for position in self.guard)
+
+    def invalidate(self, position: int):
+        self.valid = False
+
+    def fork(self) -> 'Translation':
+        return Translation(self.module, self.image, self.valid)
+
+    def rebase(self, image: [int]) -> 'Translation':
+        if image is self.image or self.matches(image):
+            return Translation(self.module, self.image)
+        return None
+
+
+def attach(computer: Computer) -> Translation:
+    image = computer.program()
+    translation = Translation(load(image), image)
+    translation.valid = translation.matches(computer._instructions)
+    return translation
+
+
+LOOP = compile_loop('transpiler', arguments=['translation'], guarded=True, before=[
+    'if translation.valid and computer.limits is None and cursor in translation.labels:',
+    '    status, cursor, computer.relative = translation.run(',
+    '        computer, memory, cursor, computer.relative, translation, wait_input)',
+    f'    if status == {HALT}:',
+    '        break',
+    f'    elif status == {WAIT}:',
+    '        return pause(computer, cursor)',
+    f'    elif status == {RELOAD}:',
+    '        memory = computer._instructions',
+    '        size = len(memory)',
+    '    continue'])
+
+
+def execute(computer: Computer, wait_input=False):
+    if not isinstance(computer.compiled, Translation):
+        computer.compiled = attach(computer)
+    return LOOP(computer, wait_input, computer.compiled)
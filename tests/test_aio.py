@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from intcode.aio import AsyncComputer
+
+INCREMENT = [3, 9, 1001, 9, 1, 9, 4, 9, 99, 0]
+ADD_TWO = [3, 11, 3, 12, 1, 11, 12, 13, 4, 13, 99, 0, 0, 0]
+
+
+def drain(queue: asyncio.Queue) -> [int]:
+    values = []
+    while not queue.empty():
+        values.append(queue.get_nowait())
+    return values
+
+
+@pytest.mark.parametrize('engine', ['instruction', 'dispatch', 'jit'])
+def test_queues_chain_computers(engine):
+    async def main():
+        first = AsyncComputer(list(INCREMENT), engine=engine)
+        second = AsyncComputer(list(INCREMENT), first.output_queue, engine=engine)
+        await first.input_queue.put(1)
+        await asyncio.wait_for(asyncio.gather(second.run_async(), first.run_async()), 5)
+        return drain(second.output_queue)
+
+    assert asyncio.run(main()) == [3]
+
+
+def test_idle_value_then_on_idle():
+    async def main():
+        idled = []
+
+        def on_idle():
+            idled.append(computer.waiting)
+            computer.input_queue.put_nowait(5)
+
+        computer = AsyncComputer(list(ADD_TWO), idle=-1, on_idle=on_idle)
+        await asyncio.wait_for(computer.run_async(), 5)
+        return idled, computer.waiting, drain(computer.output_queue)
+
+    assert asyncio.run(main()) == ([True], False, [4])
+
+
+def test_queued_inputs_are_taken_together():
+    async def main():
+        computer = AsyncComputer(list(ADD_TWO))
+        computer.input_queue.put_nowait(20)
+        computer.input_queue.put_nowait(22)
+        await asyncio.wait_for(computer.run_async(), 5)
+        return drain(computer.output_queue), computer.steps
+
+    assert asyncio.run(main()) == ([42], 5)
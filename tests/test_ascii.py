@@ -0,0 +1,42 @@
+from intcode.ascii import AsciiChannel
+from intcode.computer import Computer, Event
+
+ECHO = [3, 9, 4, 9, 1105, 1, 0, 99, 0, 0]
+
+
+def printer(values: [int]) -> AsciiChannel:
+    program = [word for value in values for word in (104, value)] + [99]
+    return AsciiChannel(Computer(program, None, None))
+
+
+def test_lines_keep_partial_line_buffered():
+    channel = printer(b'first\nsecond\nthi')
+    assert channel.run() == Event.HALT
+    assert channel.lines() == ['first', 'second']
+    assert channel.lines() == []
+    assert channel.text() == 'thi'
+
+
+def test_frames_split_on_blank_lines():
+    channel = printer(b'#.\n.#\n\n##\n..\n\n#')
+    channel.run()
+    assert channel.frames() == ['#.\n.#', '##\n..']
+    assert channel.frames() == []
+    assert channel.lines() == []
+    assert channel.text() == '#'
+
+
+def test_large_values_are_kept_apart():
+    channel = printer([*b'ok\n', 19348359, -1, *b'done\n'])
+    channel.run()
+    assert channel.values == [19348359, -1]
+    assert channel.lines() == ['ok', 'done']
+
+
+def test_written_text_is_echoed():
+    channel = AsciiChannel(Computer(list(ECHO), None, None))
+    channel.write('NOT A J\n')
+    channel.write(b'WALK\n')
+    channel.write([ord('!'), 10])
+    assert channel.run() == Event.INPUT
+    assert channel.lines() == ['NOT A J', 'WALK', '!']
@@ -0,0 +1,16 @@
+import pytest
+
+from intcode.batch import Job, run_batch
+
+RELATIVE_OUTPUT = [3, 100, 9, 100, 204, 0, 99]
+
+
+@pytest.mark.parametrize('vectorise', [False, True])
+def test_failing_lane_keeps_others(vectorise):
+    jobs = [Job((5,)), Job((-5,)), Job((7,), reads=(100,)), Job(())]
+    results = list(run_batch(RELATIVE_OUTPUT, jobs, workers=1, vectorise=vectorise))
+    assert [result.index for result in results] == [0, 1, 2, 3]
+    assert [result.outputs for result in results] == [[0], [], [0], []]
+    assert results[1].event is None and 'invalid slot: -5' in str(results[1].error)
+    assert results[2].values == [7]
+    assert all(result.error is None for result in results[:1] + results[2:])
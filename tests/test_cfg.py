@@ -0,0 +1,49 @@
+from intcode.cfg import CFG, analyse
+from intcode.computer import Computer
+
+# Calls the function at 12 with return address 9 pushed at [rb], then prints what it stored.
+CALL = [109, 100, 21101, 9, 0, 0, 1105, 1, 12, 4, 20, 99,
+        1101, 5, 6, 20, 2106, 0, 0,
+        0, 0, 7, 7]
+LOOP = [1101, 0, 0, 20, 1001, 20, 1, 20, 1007, 20, 5, 21, 1005, 21, 4, 99] + [0] * 6
+
+
+def test_call_program_runs():
+    outputs = []
+    Computer(list(CALL), None, outputs.append).resume()
+    assert outputs == [11]
+
+
+def test_calls_and_returns():
+    cfg = CFG(CALL)
+    assert sorted(cfg.blocks) == [0, 9, 12]
+    assert cfg.calls == {6: 12}
+    assert cfg.blocks[0].call == 12 and cfg.blocks[0].successors == [9]
+    assert cfg.returns == {12}
+    assert cfg.blocks[12].indirect and cfg.blocks[12].successors == []
+    assert cfg.functions() == {0: {0, 9}, 12: {12}}
+
+
+def test_data_regions():
+    cfg = CFG(CALL)
+    assert cfg.data() == [(19, 23)]
+    listing = cfg.listing()
+    assert '; call 12, returns to 9' in listing
+    assert '; return' in listing
+    assert 'data 19..23: [0, 0, 7, 7]' in listing
+
+
+def test_loops_link_both_ways():
+    cfg = CFG(LOOP)
+    assert sorted(cfg.blocks) == [0, 4, 15]
+    assert cfg.blocks[4].successors == [4, 15]
+    assert sorted(cfg.blocks[4].predecessors) == [0, 4]
+    assert cfg.calls == {} and cfg.returns == set()
+    assert cfg.data() == [(16, 22)]
+
+
+def test_analyse_finds_self_modified_operands():
+    program = [1101, 0, 7, 5, 104, 0, 99]
+    starts, labels, dynamic = analyse(program)
+    assert sorted(starts) == [0, 4, 6] and 0 in labels
+    assert dynamic == {5}
@@ -0,0 +1,68 @@
+import pytest
+
+from intcode import checkpoint
+from intcode.computer import Computer, Event
+from intcode.errors import IntcodeError
+from intcode.memory import ArrayMemory, HashedMemory
+
+# Reads two values, stores their sum far into paged memory, echoes it twice and halts.
+PROGRAM = [3, 20, 3, 21, 1, 20, 21, 5000, 4, 5000, 109, -7, 204, 5007, 3, 22, 4, 22, 99] + [0] * 4
+
+
+def suspended(memory=list, engine: str = None) -> Computer:
+    computer = Computer(memory(PROGRAM), None, None, engine=engine)
+    computer.inputs.extend([-40, 2 ** 40])
+    assert computer.run_until() == Event.INPUT
+    return computer
+
+
+@pytest.mark.parametrize('memory', [list, ArrayMemory, HashedMemory])
+@pytest.mark.parametrize('engine', ['instruction', 'dispatch', 'jit'])
+def test_round_trip_resumes_identically(memory, engine):
+    original = suspended(memory, engine)
+    restored = checkpoint.load(checkpoint.dump(original))
+    assert type(restored.memory()) is memory
+    assert (restored.engine, restored.cursor, restored.relative, restored.steps) == \
+           (original.engine, original.cursor, original.relative, original.steps)
+    assert restored.read_value(5000) == 2 ** 40 - 40
+    assert restored.fingerprint() == original.fingerprint()
+    for computer in (original, restored):
+        computer.inputs.append(-3)
+        assert computer.run_until() == Event.HALT
+    assert list(restored.outputs) == list(original.outputs) == [2 ** 40 - 40] * 2 + [-3]
+    assert restored.steps == original.steps
+
+
+def test_queued_values_survive(tmp_path):
+    computer = suspended()
+    computer.inputs.extend([7, 8])
+    computer.outputs.append(9)
+    path = str(tmp_path / 'state.icp')
+    checkpoint.save(computer, path)
+    restored = checkpoint.restore(path)
+    assert (list(restored.inputs), list(restored.outputs)) == ([7, 8], [2 ** 40 - 40] * 2 + [9])
+
+
+@pytest.mark.parametrize('data', [b'', b'ICP', b'XXXX\x00', b'ICP1\x07'])
+def test_foreign_data_is_rejected(data):
+    with pytest.raises(IntcodeError):
+        checkpoint.load(data)
+
+
+def test_truncated_checkpoints_are_rejected():
+    data = checkpoint.dump(suspended())
+    for end in range(len(data)):
+        with pytest.raises(IntcodeError):
+            checkpoint.load(data[:end])
+
+
+def test_short_pages_are_rejected():
+    data = bytearray(checkpoint.HEADER.pack(checkpoint.MAGIC, 0))
+    checkpoint.write_text(data, 'instruction')
+    for value in (0, 0, 0, 1, 99, 1, 3):
+        checkpoint.write_int(data, value)
+    checkpoint.write_ints(data, [1, 2])
+    checkpoint.write_ints(data, [])
+    checkpoint.write_ints(data, [])
+    with pytest.raises(IntcodeError, match='page: 3'):
+        checkpoint.load(bytes(data))
@@ -0,0 +1,135 @@
+import pytest
+
+from day02.input import INSTRUCTIONS as DAY02
+from day05.input import INSTRUCTIONS as DAY05
+from day07.input import INSTRUCTIONS as DAY07
+from day09.input import INSTRUCTIONS as DAY09
+from day13.input import INSTRUCTIONS as DAY13
+from day17.input import INSTRUCTIONS as DAY17
+from day19.input import INSTRUCTIONS as DAY19
+from day21.input import INSTRUCTIONS as DAY21
+from intcode import transpiler
+from intcode.computer import Computer
+from intcode.limits import MemoryLimitExceeded
+from intcode.memory import PAGE_BITS
+
+ENGINES = ['dispatch', 'jit', 'aot', 'fused', 'profile', 'trace']
+
+FAR_LOOP = [1101, 0, 51, 5000, 1001, 5000, 2, 5000, 1007, 5000, 100, 5001, 1005, 5001, 4,
+            4, 5000, 99]
+
+SHIPPED = {'day02': ([DAY02[0], 12, 2] + DAY02[3:], []),
+           'day05 part 1': (DAY05, [1]),
+           'day05 part 2': (DAY05, [5]),
+           'day07': (DAY07, [4, 0]),
+           'day09': (DAY09, [1]),
+           'day13': (DAY13, []),
+           'day17': (DAY17, []),
+           'day19': (DAY19, [10, 20]),
+           'day21': (DAY21, [ord(character) for character in 'NOT A J\nWALK\n'])}
+
+SYNTHETIC = {'far loop': (FAR_LOOP, []),
+             'far relative write': ([109, 100000, 21101, 7, 8, 0, 204, 0, 99], []),
+             'rewritten halt': ([1101, 0, 99, 4, 1101, 5, 5, 20, 4, 20, 99] + [0] * 10, []),
+             'rewritten operand': ([1101, 0, 0, 30, 1001, 30, 1, 30, 1001, 6, 1, 6, 1007, 30, 5000,
+                                    31, 1005, 31, 4, 4, 30, 99] + [0] * 10, []),
+             'rewritten opcode': ([1101, 0, 0, 40, 1001, 40, 1, 40, 1008, 40, 100, 41, 1006, 41, 26,
+                                   1101, 0, 1002, 4, 1101, 0, 2, 6, 1105, 1, 26, 1007, 40, 1000, 42,
+                                   1005, 42, 4, 4, 40, 99] + [0] * 8, []),
+             'big product': ([1102, 2 ** 40, 2 ** 40, 9, 4, 9, 99, 0, 0, 0], []),
+             'squaring loop': ([1101, 0, 3, 30, 2, 30, 30, 30, 1001, 31, 1, 31, 1007, 31, 8, 32,
+                                1005, 32, 4, 4, 30, 99] + [0] * 11, []),
+             'counted input': ([3, 30, 1001, 30, -1, 30, 1001, 31, 3, 31, 1005, 30, 2, 4, 31, 99] +
+                               [0] * 16, [40])}
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(transpiler, 'CACHE_DIRECTORY', str(tmp_path))
+
+
+def cells(computer: Computer) -> {int: int}:
+    memory = {position: value for position, value in enumerate(computer._instructions) if value}
+    for index, page in computer.pages.pages.items():
+        memory.update({(index << PAGE_BITS) + offset: value
+                       for offset, value in enumerate(page) if value})
+    return memory
+
+
+def run(program: [int], engine: str, inputs: [int] = ()) -> ([int], int, {int: int}):
+    inputs = list(inputs)
+    outputs = []
+    computer = Computer(list(program), lambda: inputs.pop(0), outputs.append, engine=engine)
+    computer.resume()
+    return outputs, computer.steps, cells(computer)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_far_paged_loop(engine):
+    assert run(FAR_LOOP, engine) == run(FAR_LOOP, 'instruction')
+    assert run(FAR_LOOP, engine)[:2] == ([101], 78)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize('name', SHIPPED)
+def test_shipped_programs(name, engine):
+    program, inputs = SHIPPED[name]
+    assert run(program, engine, inputs) == run(program, 'instruction', inputs)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize('name', SYNTHETIC)
+def test_synthetic_programs(name, engine):
+    program, inputs = SYNTHETIC[name]
+    assert run(program, engine, inputs) == run(program, 'instruction', inputs)
+
+
+@pytest.mark.parametrize('engine', ['instruction'] + ENGINES)
+def test_forks_write_privately(engine):
+    program = [3, 30, 3, 31, 1, 30, 31, 32, 4, 32, 99] + [0] * 100
+    parent = Computer(program, None, None, engine=engine)
+    parent.inputs.append(5)
+    parent.run_until()
+    child = parent.fork()
+    child.inputs.append(1)
+    child.run_until()
+    parent.inputs.append(2)
+    parent.run_until()
+    assert (list(parent.outputs), list(child.outputs)) == ([7], [6])
+    assert (parent.read_value(32), child.read_value(32)) == (7, 6)
+    if engine == 'instruction':
+        assert child._instructions is parent._instructions
+
+
+@pytest.mark.parametrize('engine', ['instruction'] + ENGINES)
+def test_fingerprints_follow_writes(engine):
+    program = [3, 30, 3, 31, 1, 30, 31, 32, 4, 32, 99] + [0] * 100
+    parent = Computer(program.copy(), None, None, engine=engine)
+    parent.inputs.append(5)
+    parent.run_until()
+    parent.fingerprint()
+    child = parent.fork()
+    child.inputs.append(1)
+    child.run_until()
+    twin = Computer(program.copy(), None, None, engine=engine)
+    twin.inputs.extend([5, 1])
+    twin.run_until()
+    assert child.fingerprint() == twin.fingerprint() != parent.fingerprint()
+    child.update_value(5000, 9)
+    assert child.fingerprint() != twin.fingerprint()
+    child.update_value(5000, 0)
+    assert child.fingerprint() == twin.fingerprint()
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_limits_count_the_failing_step(engine):
+    program = [109, 1, 21101, 0, 1, 200, 1105, 1, 0]
+    expected = Computer(list(program), None, None)
+    expected.limit(cells=2000)
+    with pytest.raises(MemoryLimitExceeded):
+        expected.resume()
+    computer = Computer(list(program), None, None, engine=engine)
+    computer.limit(cells=2000)
+    with pytest.raises(MemoryLimitExceeded):
+        computer.resume()
+    assert computer.steps == expected.steps
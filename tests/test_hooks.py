@@ -0,0 +1,44 @@
+import pytest
+
+from intcode.computer import Computer, Event
+from intcode.jit import Jit
+
+COUNTER = [1101, 0, 0, 20, 1001, 20, 1, 20, 1007, 20, 50, 21, 1005, 21, 4, 4, 20, 99] + [0] * 4
+
+
+@pytest.mark.parametrize('engine', ['instruction', 'dispatch', 'jit', 'fused'])
+def test_watchpoints_see_every_change(engine):
+    computer = Computer(list(COUNTER), None, None, engine=engine)
+    changes = []
+    computer.instrument().watch(20, lambda _, position, previous, value: changes.append(value))
+    computer.run_until()
+    assert changes == list(range(1, 51))
+    assert list(computer.outputs) == [50]
+
+
+def test_breakpoints_pause_and_resume():
+    computer = Computer(list(COUNTER), None, None)
+    hooks = computer.instrument()
+    hooks.break_at(15)
+    assert computer.run_until() == Event.BREAK
+    assert computer.cursor == 15 and computer.read_value(20) == 50
+    hooks.clear()
+    assert computer.run_until() == Event.HALT
+    assert list(computer.outputs) == [50]
+
+
+def test_hooks_keep_compiled_state():
+    computer = Computer(list(COUNTER), None, None, engine='jit')
+    computer.run_until()
+    compiled = computer.compiled
+    hooks = computer.instrument()
+    steps = []
+    hooks.on_step(lambda machine: steps.append(machine.cursor))
+    computer.cursor = 0
+    computer.run_until()
+    assert computer.compiled is compiled and isinstance(compiled, Jit)
+    assert len(steps) == 153
+    hooks.clear()
+    computer.cursor = 0
+    computer.run_until()
+    assert list(computer.outputs) == [50, 50, 50] and len(steps) == 153
@@ -0,0 +1,66 @@
+import pytest
+
+from intcode.computer import Computer
+from intcode.scheduler import Scheduler
+
+INCREMENT = [3, 9, 1001, 9, 1, 9, 4, 9, 99, 0]
+SINK = [3, 5, 1105, 1, 0, 0]
+SPIN = [1105, 1, 0]
+
+
+def machine(program: [int], engine: str = None) -> Computer:
+    return Computer(list(program), None, None, engine=engine)
+
+
+def test_connected_tasks_route_values():
+    scheduler = Scheduler()
+    received = []
+    first = scheduler.add(machine(INCREMENT))
+    second = scheduler.add(machine(INCREMENT), received.append)
+    scheduler.connect(first, second)
+    scheduler.send(first, 1)
+    scheduler.run()
+    assert received == [3]
+    assert first.halted and second.halted
+
+
+@pytest.mark.parametrize('policy, expected', [('round-robin', [1, 2, 3]), ('priority', [3, 1, 2])])
+def test_policies_order_ready_tasks(policy, expected):
+    scheduler = Scheduler(policy)
+    order = []
+    for value, priority in [(1, 1), (2, 0), (3, 5)]:
+        scheduler.add(machine([104, value, 99]), order.append, priority)
+    scheduler.run()
+    assert order == expected
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        Scheduler('lottery')
+
+
+@pytest.mark.parametrize('time_slice', [0, -3])
+def test_empty_time_slice_is_rejected(time_slice):
+    with pytest.raises(ValueError):
+        Scheduler(time_slice=time_slice)
+
+
+@pytest.mark.parametrize('engine', ['instruction', 'dispatch', 'jit', 'fused'])
+def test_time_slice_preempts_compute_bound_tasks(engine):
+    scheduler = Scheduler(time_slice=10)
+    spinner = scheduler.add(machine(SPIN, engine))
+    scheduler.add(machine([104, 7, 99], engine), lambda value: scheduler.stop())
+    scheduler.run()
+    assert spinner.computer.steps == 10
+    assert spinner.computer.limits is None
+
+
+def test_idle_value_is_polled_once_per_wakeup():
+    scheduler = Scheduler()
+    task = scheduler.add(machine(SINK), idle=-1)
+    scheduler.run()
+    assert task.blocked and task.computer.steps == 2
+    scheduler.send(task, 4)
+    scheduler.run()
+    assert task.blocked and task.computer.steps == 6
+    assert task.computer.read_value(5) == -1